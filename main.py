@@ -9,15 +9,14 @@ Supports acquisition, decryption, parsing, and reporting of WhatsApp data.
 """
 
 import argparse
+import os
 import sys
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
-from src.acquisition import WhatsAppAcquirer, AcquisitionSource
-from src.crypto import WhatsAppDecryptor
-from src.parsing import WhatsAppParser
-from src.reporting import WhatsAppReporter, ReportFormat
-from src.integration import ForensicToolkitIntegration
+# Toolkit modules are imported inside the command handlers so each command
+# only loads what it uses (reportlab alone takes ~100 ms to import).
 
 # Setup logging
 logging.basicConfig(
@@ -159,6 +158,8 @@ Examples:
 
 def handle_acquire(args):
     """Handle acquisition command"""
+    from src.acquisition import WhatsAppAcquirer
+    
     logger.info(f"Starting acquisition from {args.source}")
     
     acquirer = WhatsAppAcquirer(output_dir=args.output)
@@ -183,6 +184,8 @@ def handle_acquire(args):
 
 def handle_decrypt(args):
     """Handle decryption command"""
+    from src.crypto import WhatsAppDecryptor
+    
     logger.info(f"Decrypting {args.input}")
     
     decryptor = WhatsAppDecryptor(args.key)
@@ -199,6 +202,9 @@ def handle_decrypt(args):
 
 def handle_parse(args):
     """Handle parsing command"""
+    from src.parsing import WhatsAppParser
+    from src.reporting import WhatsAppReporter
+    
     logger.info(f"Parsing database: {args.msgstore}")
     
     parser = WhatsAppParser(args.msgstore, args.wa, args.status, args.media)
@@ -241,8 +247,9 @@ def handle_parse(args):
         chats = chats[:args.chat_limit]
     
     logger.info("Extracting messages...")
+    messages_by_chat = parser.get_messages_batch([chat.jid for chat in chats], args.message_limit)
     for chat in chats:
-        chat.messages = parser.get_messages(chat.jid, args.message_limit)
+        chat.messages = messages_by_chat.get(chat.jid, [])
     
     logger.info("Extracting contacts...")
     contacts = parser.get_contacts()
@@ -270,9 +277,12 @@ def handle_parse(args):
     
     formats = [args.format] if args.format != 'all' else ['html', 'json', 'csv', 'pdf']
     
+    # Serialize the parsed data once for every requested format
+    view_model = reporter.prepare_view_model(chats, contacts, call_logs, metadata)
+    
     for fmt in formats:
         if fmt == 'html':
-            report_file = reporter.generate_html_report(chats, contacts, call_logs, metadata)
+            report_file = reporter.generate_html_report(chats, contacts, call_logs, view_model=view_model)
             logger.info(f"Generated HTML report: {report_file}")
         elif fmt == 'json':
             # Add timeline to JSON report if requested
@@ -280,18 +290,23 @@ def handle_parse(args):
             if args.timeline:
                 data_to_export['timeline'] = timeline
             
-            report_file = reporter.generate_json_report(chats, contacts, call_logs, metadata)
+            report_file = reporter.generate_json_report(chats, contacts, call_logs, view_model=view_model)
             logger.info(f"Generated JSON report: {report_file}")
         elif fmt == 'csv':
-            report_files = reporter.generate_csv_report(chats, contacts, call_logs)
+            report_files = reporter.generate_csv_report(chats, contacts, call_logs, view_model=view_model)
             logger.info(f"Generated CSV reports: {report_files}")
         elif fmt == 'pdf':
-            report_file = reporter.generate_pdf_report(chats, contacts, call_logs, metadata)
+            report_file = reporter.generate_pdf_report(chats, contacts, call_logs, view_model=view_model)
             logger.info(f"Generated PDF report: {report_file}")
 
 
 def handle_full(args):
     """Handle full workflow command"""
+    from src.acquisition import WhatsAppAcquirer
+    from src.crypto import WhatsAppDecryptor
+    from src.parsing import WhatsAppParser
+    from src.reporting import WhatsAppReporter
+    
     logger.info("Starting full workflow...")
     
     output_dir = Path(args.output)
@@ -310,56 +325,62 @@ def handle_full(args):
     else:
         raise ValueError(f"Unsupported source: {args.source}")
     
-    summary = acquirer.get_acquisition_summary(acquired)
-    logger.info(f"Acquisition summary: {summary}")
-    
-    # Step 2: Decrypt if needed
-    msgstore_path = None
-    
-    # Find encrypted databases in acquired files
-    encrypted_dbs = [path for name, path in acquired.items() if 'crypt' in Path(path).name or Path(path).name.endswith(('.crypt12', '.crypt14', '.crypt15'))]
-    
-    if encrypted_dbs:
-        logger.info("Step 2: Decryption")
-        if not args.key:
-            logger.warning("Encrypted databases found but no key provided. Skipping decryption.")
-        else:
-            decryptor = WhatsAppDecryptor(args.key)
-            for enc_db in encrypted_dbs:
-                decrypted = decryptor.decrypt(enc_db)
-                if decrypted:
-                    msgstore_path = decrypted
-                    logger.info(f"Decrypted database: {decrypted}")
-                    break
+    # The summary walks media folders for sizes and is only logged, so compute
+    # it in the background while decryption runs
+    with ThreadPoolExecutor(max_workers=1) as summary_executor:
+        summary_future = summary_executor.submit(acquirer.get_acquisition_summary, acquired)
+        
+        # Classify acquired files in one pass: encrypted databases in acquisition
+        # order, and the first plain file seen for each filename
+        encrypted_dbs = []
+        plain_files = {}
+        for path in acquired.values():
+            name = os.path.basename(path)
+            if 'crypt' in name:
+                encrypted_dbs.append(path)
+            else:
+                plain_files.setdefault(name, path)
+        
+        # Step 2: Decrypt if needed
+        msgstore_path = None
+        
+        if encrypted_dbs:
+            logger.info("Step 2: Decryption")
+            if not args.key:
+                logger.warning("Encrypted databases found but no key provided. Skipping decryption.")
+            else:
+                decryptor = WhatsAppDecryptor(args.key)
+                for enc_db in encrypted_dbs:
+                    decrypted = decryptor.decrypt(enc_db)
+                    if decrypted:
+                        msgstore_path = decrypted
+                        logger.info(f"Decrypted database: {decrypted}")
+                        break
+        
+        logger.info(f"Acquisition summary: {summary_future.result()}")
     
     # If no encrypted databases or decryption failed, look for unencrypted
     if not msgstore_path:
-        # Find unencrypted msgstore.db
-        unencrypted_dbs = [path for name, path in acquired.items() if Path(path).name == 'msgstore.db']
-        if unencrypted_dbs:
-            msgstore_path = unencrypted_dbs[0]
+        msgstore_path = plain_files.get('msgstore.db')
+        if msgstore_path:
             logger.info(f"Using unencrypted database: {msgstore_path}")
         else:
             raise ValueError("No database found to parse")
     
     # Step 3: Parse
     logger.info("Step 3: Parsing")
-    # Find wa.db if available
-    wa_dbs = [path for name, path in acquired.items() if Path(path).name == 'wa.db']
-    wa_db_path = wa_dbs[0] if wa_dbs else None
-    
-    # Find status.db and media.db if available
-    status_dbs = [path for name, path in acquired.items() if Path(path).name == 'status.db']
-    status_db_path = status_dbs[0] if status_dbs else None
-    
-    media_dbs = [path for name, path in acquired.items() if Path(path).name == 'media.db']
-    media_db_path = media_dbs[0] if media_dbs else None
+    # wa.db, status.db and media.db are optional
+    wa_db_path = plain_files.get('wa.db')
+    status_db_path = plain_files.get('status.db')
+    media_db_path = plain_files.get('media.db')
     
     parser = WhatsAppParser(msgstore_path, wa_db_path, status_db_path, media_db_path)
     
     chats = parser.get_chats()
+    # Limit messages per chat
+    messages_by_chat = parser.get_messages_batch([chat.jid for chat in chats], limit_per_chat=1000)
     for chat in chats:
-        chat.messages = parser.get_messages(chat.jid, limit=1000)  # Limit messages per chat
+        chat.messages = messages_by_chat.get(chat.jid, [])
     
     contacts = parser.get_contacts()
     call_logs = parser.get_call_logs()
@@ -378,18 +399,21 @@ def handle_full(args):
     
     formats = [args.format] if args.format != 'all' else ['html', 'json', 'csv', 'pdf']
     
+    # Serialize the parsed data once for every requested format
+    view_model = reporter.prepare_view_model(chats, contacts, call_logs, metadata)
+    
     for fmt in formats:
         if fmt == 'html':
-            report_file = reporter.generate_html_report(chats, contacts, call_logs, metadata)
+            report_file = reporter.generate_html_report(chats, contacts, call_logs, view_model=view_model)
             logger.info(f"Generated HTML report: {report_file}")
         elif fmt == 'json':
-            report_file = reporter.generate_json_report(chats, contacts, call_logs, metadata)
+            report_file = reporter.generate_json_report(chats, contacts, call_logs, view_model=view_model)
             logger.info(f"Generated JSON report: {report_file}")
         elif fmt == 'csv':
-            report_files = reporter.generate_csv_report(chats, contacts, call_logs)
+            report_files = reporter.generate_csv_report(chats, contacts, call_logs, view_model=view_model)
             logger.info(f"Generated CSV reports: {report_files}")
         elif fmt == 'pdf':
-            report_file = reporter.generate_pdf_report(chats, contacts, call_logs, metadata)
+            report_file = reporter.generate_pdf_report(chats, contacts, call_logs, view_model=view_model)
             logger.info(f"Generated PDF report: {report_file}")
     
     logger.info("Full workflow complete!")
@@ -397,33 +421,34 @@ def handle_full(args):
 
 def handle_case(args):
     """Handle modular end-to-end case workflow command."""
+    from src.integration import ForensicToolkitIntegration
+
     logger.info(f"Starting case workflow for case {args.case_id}")
 
-    integration = ForensicToolkitIntegration(
+    with ForensicToolkitIntegration(
         case_id=args.case_id,
         examiner=args.examiner,
         output_dir=args.output,
         enforce_write_blocker=not args.disable_write_blocker
-    )
-
-    metadata = {
-        'company': args.metadata_company or 'WhatsApp Forensics Report',
-        'examiner': args.metadata_examiner or args.examiner,
-        'record': args.metadata_record or args.case_id,
-        'unit': args.metadata_unit or 'Forensics Unit',
-        'notes': args.metadata_notes or 'Automated forensic case workflow'
-    }
+    ) as integration:
+        metadata = {
+            'company': args.metadata_company or 'WhatsApp Forensics Report',
+            'examiner': args.metadata_examiner or args.examiner,
+            'record': args.metadata_record or args.case_id,
+            'unit': args.metadata_unit or 'Forensics Unit',
+            'notes': args.metadata_notes or 'Automated forensic case workflow'
+        }
 
-    result = integration.run_case_workflow(
-        source=args.source,
-        method='forensic_logical_copy',
-        input_path=args.input,
-        device_id=args.device_id,
-        key_file=args.key,
-        report_format=args.format,
-        metadata=metadata,
-        include_media=args.include_media,
-    )
+        result = integration.run_case_workflow(
+            source=args.source,
+            method='forensic_logical_copy',
+            input_path=args.input,
+            device_id=args.device_id,
+            key_file=args.key,
+            report_format=args.format,
+            metadata=metadata,
+            include_media=args.include_media,
+        )
 
     if not result.get('success'):
         raise RuntimeError(result.get('error', 'Case workflow failed'))
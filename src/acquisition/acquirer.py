@@ -7,15 +7,24 @@ WhatsApp Acquisition Module
 Handles acquisition of WhatsApp databases and media from various sources.
 """
 
+import asyncio
+import copy
+import hashlib
 import os
+import posixpath
 import re
+import shlex
 import shutil
 import sqlite3
+import stat
 import subprocess
 import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache
 from pathlib import Path
 from enum import Enum
-from typing import Optional, Dict, List, Tuple, Any
+from typing import Optional, Dict, Iterator, List, Tuple, Any
 import logging
 
 # Add project root to path to allow importing tools
@@ -25,6 +34,43 @@ if str(project_root) not in sys.path:
 
 logger = logging.getLogger(__name__)
 
+SQLITE_HEADER_MAGIC = b"SQLite format 3\x00"
+MEDIA_FILE_EXTENSIONS = frozenset({"jpg", "jpeg", "png", "mp4", "3gp", "opus", "webp"})
+
+# WhatsApp files collected by local file acquisition and indexed after ADB pulls
+LOCAL_TARGET_FILES = frozenset({
+    "msgstore.db",
+    "msgstore.db.crypt12",
+    "msgstore.db.crypt14",
+    "msgstore.db.crypt15",
+    "wa.db",
+    "axolotl.db",
+    "key",
+})
+LOCAL_TARGET_SUFFIXES = (".crypt14", ".crypt15")
+# Pulled ADB database folders also index older crypt12 backups
+ADB_TARGET_SUFFIXES = (".crypt12", ".crypt14", ".crypt15")
+
+# How long adb device and root probes are reused
+ADB_PROBE_TTL_SECONDS = 5.0
+
+# Concurrent adb pulls and the overall time allowed for them
+ADB_PULL_WORKERS = 8
+ADB_PULL_TIMEOUT_SECONDS = 300
+ADB_PULL_DEADLINE_SECONDS = 1800
+
+# Concurrent local copies; spinning disks lose throughput to seeking when
+# several streams compete, so they get fewer workers
+COPY_MAX_WORKERS = 32
+COPY_ROTATIONAL_WORKERS = 2
+
+# Read buffer for copies that hash the data on the way through
+COPY_HASH_BUFFER_SIZE = 1024 * 1024
+
+# Progress logging interval for batch copies
+COPY_PROGRESS_FILES = 500
+COPY_PROGRESS_SECONDS = 2.0
+
 
 class AcquisitionSource(Enum):
     """Enumeration of acquisition sources"""
@@ -55,6 +101,13 @@ class WhatsAppAcquirer:
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(parents=True, exist_ok=True)
         self.logger = logger  # Ensure logger is available as instance variable if needed
+        # Summary built while acquiring, keyed by a snapshot of the result it describes
+        self._last_acquired: Optional[Dict[str, str]] = None
+        self._last_summary: Optional[Dict[str, Any]] = None
+        # Whether the remembered summary has the SHA-256 of every acquired file
+        self._last_summary_hashed = False
+        # (adb binary, requested device) -> (probe time, _probe_adb() result)
+        self._adb_probe_cache: Dict[Tuple[str, Optional[str]], Tuple[float, Tuple[List[str], str, str, bool]]] = {}
 
     def _sanitize_device_label(self, label: str) -> str:
         safe = re.sub(r"[^A-Za-z0-9_.-]+", "_", label.strip())
@@ -82,6 +135,160 @@ class WhatsAppAcquirer:
                 logger.debug(f"Could not acquire key via run-as: {e}")
         return None
 
+    def _probe_device_paths(self, adb_cmd: List[str], jobs: List[Tuple[str, Path, bool]]) -> set:
+        """
+        Check which device paths exist with a single adb shell invocation.
+        
+        Args:
+            adb_cmd: Base adb command including the device selector
+            jobs: List of (remote_path, dest_path, is_dir) tuples
+            
+        Returns:
+            Set of remote paths that exist as a file (or directory for is_dir jobs)
+        """
+        probe_script = " ; ".join(
+            f"test {'-d' if is_dir else '-f'} {shlex.quote(path)} && echo {shlex.quote(path)}"
+            for path, _, is_dir in jobs
+        )
+        try:
+            proc = subprocess.run(adb_cmd + ["shell", probe_script], capture_output=True, text=True, timeout=15)
+        except subprocess.TimeoutExpired:
+            logger.warning("Timeout checking WhatsApp paths on device")
+            return set()
+        except Exception as e:
+            logger.debug(f"Could not check WhatsApp paths on device: {e}")
+            return set()
+        # Older adb versions run the shell on a pty and end lines with \r\n
+        return {line.rstrip("\r") for line in proc.stdout.splitlines()}
+
+    def _run_pull_jobs(
+        self,
+        adb_cmd: List[str],
+        jobs: List[Tuple[str, Path, bool]],
+        deadline: float,
+    ) -> List[Tuple[str, Path, bool]]:
+        """
+        Pull a group of existing device paths that share a local destination.
+        
+        Args:
+            adb_cmd: Base adb command including the device selector
+            jobs: List of (remote_path, dest_path, is_dir) tuples, pulled in order
+            deadline: time.monotonic() value after which no pull is started
+            
+        Returns:
+            The jobs that were pulled successfully
+        """
+        pulled: List[Tuple[str, Path, bool]] = []
+        for path, dest_path, is_dir in jobs:
+            kind = "directory " if is_dir else ""
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                logger.warning(f"Acquisition time limit reached, skipping {kind}{path}")
+                continue
+            try:
+                if is_dir and dest_path.exists() and dest_path.is_dir():
+                    shutil.rmtree(dest_path)
+                pull_cmd = adb_cmd + ["pull", path, str(dest_path)]
+                
+                # adb prints a progress line per file; only stderr is needed for diagnostics
+                proc = subprocess.run(
+                    pull_cmd,
+                    stdout=subprocess.DEVNULL,
+                    stderr=subprocess.PIPE,
+                    timeout=min(ADB_PULL_TIMEOUT_SECONDS, remaining),
+                )
+                
+                if proc.returncode == 0 and dest_path.exists():
+                    pulled.append((path, dest_path, is_dir))
+                    if is_dir:
+                        logger.info(f"✓ Acquired directory: {path} -> {dest_path}")
+                    else:
+                        logger.info(f"✓ Acquired: {path} -> {dest_path}")
+                else:
+                    error_msg = (proc.stderr or b"").decode("utf-8", "replace").strip()
+                    if "Permission denied" in error_msg or "permission" in error_msg.lower():
+                        logger.warning(f"Permission denied for {path} (may require root)")
+                    else:
+                        logger.debug(f"Could not acquire {kind}{path}: {error_msg}")
+                
+            except subprocess.TimeoutExpired:
+                logger.warning(f"Timeout acquiring {kind}{path}")
+            except Exception as e:
+                logger.debug(f"Could not acquire {kind}{path}: {e}")
+        return pulled
+
+    def _probe_adb(self, adb_bin: str, device_id: Optional[str]) -> Tuple[List[str], str, str, bool]:
+        """
+        Find the device to acquire from and check it for root access.
+        
+        Results are reused for ADB_PROBE_TTL_SECONDS, so chained acquisitions
+        in one run do not repeat the device and root probes.
+        
+        Args:
+            adb_bin: Path to the adb executable
+            device_id: Optional device ID if multiple devices connected
+            
+        Returns:
+            Tuple of (connected serials, selected serial, device label, root available)
+        """
+        now = time.monotonic()
+        cached = self._adb_probe_cache.get((adb_bin, device_id))
+        if cached is not None and now - cached[0] < ADB_PROBE_TTL_SECONDS:
+            return cached[1]
+        
+        proc = subprocess.run(
+            [adb_bin, "devices"],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            timeout=10,
+        )
+        # Each attached device is listed as "<serial>\t<state>"; only the
+        # "device" state is usable (not "unauthorized" or "offline")
+        device_serials = [
+            line.split(b"\t", 1)[0].decode("utf-8", "replace")
+            for line in proc.stdout.splitlines()
+            if line.endswith(b"\tdevice")
+        ]
+        if not device_serials:
+            raise RuntimeError(
+                "No Android device connected via ADB.\n"
+                "Please ensure:\n"
+                "  1. USB debugging is enabled on your device\n"
+                "  2. You've authorized the computer on your device\n"
+                "  3. Device shows as 'device' (not 'unauthorized' or 'offline')"
+            )
+
+        if device_id:
+            if device_id not in device_serials:
+                raise RuntimeError(f"Requested device {device_id} not found in adb devices output")
+            selected_serial = device_id
+        else:
+            selected_serial = device_serials[0]
+
+        adb_cmd = [adb_bin, "-s", selected_serial]
+
+        device_label_raw = selected_serial
+        try:
+            model_proc = subprocess.run(
+                adb_cmd + ["shell", "getprop", "ro.product.model"],
+                capture_output=True,
+                text=True,
+                timeout=5,
+            )
+            model = model_proc.stdout.strip()
+            if model:
+                device_label_raw = model
+        except Exception:
+            pass
+
+        test_root_cmd = adb_cmd + ["shell", "su", "-c", "ls /data/data/com.whatsapp 2>/dev/null"]
+        root_test = subprocess.run(test_root_cmd, capture_output=True, text=True, timeout=5)
+        root_available = bool(root_test.returncode == 0 and root_test.stdout.strip())
+        
+        probe = (device_serials, selected_serial, device_label_raw, root_available)
+        self._adb_probe_cache[(adb_bin, device_id)] = (time.monotonic(), probe)
+        return probe
+
     def acquire_from_android_adb(self, device_id: Optional[str] = None, include_media: bool = False) -> Dict[str, str]:
         """
         Acquire WhatsApp data from Android device via ADB.
@@ -97,59 +304,29 @@ class WhatsAppAcquirer:
         """
         logger.info("Starting ADB acquisition")
         result: Dict[str, str] = {}
+        # Pulls may overwrite files a remembered summary was computed from
+        self._last_acquired = None
+        self._last_summary = None
         acquired_dirs: List[Tuple[str, Path]] = []
         
+        # Resolve adb once so every spawned command skips the PATH search
+        adb_bin = shutil.which("adb")
+        if adb_bin is None:
+            raise RuntimeError(
+                "ADB not found. Please install Android SDK Platform Tools:\n"
+                "  macOS: brew install android-platform-tools\n"
+                "  Linux: sudo apt-get install adb\n"
+                "  Or download from: https://developer.android.com/studio/releases/platform-tools"
+            )
+        
         try:
-            base_adb_cmd = ["adb"]
-            check_cmd = base_adb_cmd + ["devices"]
-            proc = subprocess.run(check_cmd, capture_output=True, text=True)
-            device_lines = [line for line in proc.stdout.splitlines() if "device" in line and "List" not in line]
-            if not device_lines:
-                raise RuntimeError(
-                    "No Android device connected via ADB.\n"
-                    "Please ensure:\n"
-                    "  1. USB debugging is enabled on your device\n"
-                    "  2. You've authorized the computer on your device\n"
-                    "  3. Device shows as 'device' (not 'unauthorized' or 'offline')"
-                )
-
-            selected_serial: Optional[str] = None
-            if device_id:
-                for line in device_lines:
-                    serial = line.split()[0]
-                    if serial == device_id:
-                        selected_serial = device_id
-                        break
-                if not selected_serial:
-                    raise RuntimeError(f"Requested device {device_id} not found in adb devices output")
-            else:
-                selected_serial = device_lines[0].split()[0]
-
-            adb_cmd = base_adb_cmd + ["-s", selected_serial]
-
-            device_label_raw = selected_serial or "device"
-            try:
-                model_proc = subprocess.run(
-                    adb_cmd + ["shell", "getprop", "ro.product.model"],
-                    capture_output=True,
-                    text=True,
-                    timeout=5,
-                )
-                model = model_proc.stdout.strip()
-                if model:
-                    device_label_raw = model
-            except Exception:
-                pass
-
+            device_serials, selected_serial, device_label_raw, root_available = self._probe_adb(adb_bin, device_id)
+            adb_cmd = [adb_bin, "-s", selected_serial]
             device_label = self._sanitize_device_label(device_label_raw)
 
-            logger.info(f"Device connected: {len(device_lines)} device(s) found")
+            logger.info(f"Device connected: {len(device_serials)} device(s) found")
             
-            root_available = False
-            test_root_cmd = adb_cmd + ["shell", "su", "-c", "ls /data/data/com.whatsapp 2>/dev/null"]
-            root_test = subprocess.run(test_root_cmd, capture_output=True, text=True, timeout=5)
-            if root_test.returncode == 0 and root_test.stdout.strip():
-                root_available = True
+            if root_available:
                 logger.info("Root access detected - can access /data/data/")
             else:
                 logger.warning(
@@ -205,106 +382,82 @@ class WhatsAppAcquirer:
                     "/storage/emulated/0/Android/media/com.whatsapp/WhatsApp/Media",
                 ])
             
+            pull_jobs: List[Tuple[str, Path, bool]] = []
             for path in file_paths:
-                try:
-                    test_cmd = adb_cmd + ["shell", "test", "-f", path, "&&", "echo", "exists"]
-                    test_proc = subprocess.run(test_cmd, capture_output=True, text=True, timeout=10)
-                    
-                    if "exists" not in test_proc.stdout:
-                        logger.debug(f"Path does not exist on device: {path}")
-                        continue
-                    
-                    filename = Path(path).name
-                    if "Databases" in path or filename.endswith(".db") or ".db.crypt" in filename:
-                        dest_base = databases_dir
-                    elif filename == "key":
-                        dest_base = acquisition_dir
-                    else:
-                        dest_base = acquisition_dir
-                    dest_path = dest_base / filename
-                    pull_cmd = adb_cmd + ["pull", path, str(dest_path)]
-                    
-                    proc = subprocess.run(pull_cmd, capture_output=True, text=True, timeout=300)
-                    
-                    if proc.returncode == 0 and dest_path.exists():
-                        result[path] = str(dest_path)
-                        logger.info(f"✓ Acquired: {path} -> {dest_path}")
-                    else:
-                        error_msg = proc.stderr.strip() if proc.stderr else proc.stdout.strip()
-                        if "Permission denied" in error_msg or "permission" in error_msg.lower():
-                            logger.warning(f"Permission denied for {path} (may require root)")
-                        else:
-                            logger.debug(f"Could not acquire {path}: {error_msg}")
-                    
-                except subprocess.TimeoutExpired:
-                    logger.warning(f"Timeout acquiring {path}")
-                except Exception as e:
-                    logger.debug(f"Could not acquire {path}: {e}")
-            
+                filename = posixpath.basename(path)
+                if "Databases" in path or filename.endswith(".db") or ".db.crypt" in filename:
+                    dest_base = databases_dir
+                elif filename == "key":
+                    dest_base = acquisition_dir
+                else:
+                    dest_base = acquisition_dir
+                pull_jobs.append((path, dest_base / filename, False))
+
             for path in dir_paths:
-                try:
-                    test_cmd = adb_cmd + ["shell", "test", "-d", path, "&&", "echo", "exists"]
-                    test_proc = subprocess.run(test_cmd, capture_output=True, text=True, timeout=10)
-                    
-                    if "exists" not in test_proc.stdout:
-                        logger.debug(f"Directory does not exist on device: {path}")
+                if "Databases" in path:
+                    dest_path = databases_dir
+                elif "Media" in path:
+                    if not include_media:
+                        logger.debug(f"Skipping media directory (include_media is False): {path}")
                         continue
-                    
-                    if "Databases" in path:
-                        dest_path = databases_dir
-                    elif "Media" in path:
-                        if not include_media:
-                            logger.debug(f"Skipping media directory (include_media is False): {path}")
+                    dest_path = media_dir
+                else:
+                    dest_path = acquisition_dir / posixpath.basename(path)
+                pull_jobs.append((path, dest_path, True))
+
+            # A file inside a directory that is pulled to the same place comes
+            # along with that directory (whose pull clears the destination
+            # first), so pulling it on its own is wasted work
+            dir_pulls = {(path, dest_path) for path, dest_path, is_dir in pull_jobs if is_dir}
+            pull_jobs = [
+                job for job in pull_jobs
+                if job[2] or (posixpath.dirname(job[0]), job[1].parent) not in dir_pulls
+            ]
+
+            existing_paths = self._probe_device_paths(adb_cmd, pull_jobs)
+            if logger.isEnabledFor(logging.DEBUG):
+                for path, _, is_dir in pull_jobs:
+                    if path not in existing_paths:
+                        logger.debug(f"{'Directory' if is_dir else 'Path'} does not exist on device: {path}")
+            pull_jobs = [job for job in pull_jobs if job[0] in existing_paths]
+
+            # Pulls that write into the same local directory overwrite each other
+            # (directory pulls clear their destination first), so they run in
+            # order on one worker; independent destinations are pulled concurrently,
+            # with at most ADB_PULL_WORKERS adb connections open at a time.
+            pull_groups: Dict[Path, List[Tuple[str, Path, bool]]] = {}
+            for job in pull_jobs:
+                _, dest_path, is_dir = job
+                group_dir = dest_path if is_dir else dest_path.parent
+                pull_groups.setdefault(group_dir, []).append(job)
+
+            deadline = time.monotonic() + ADB_PULL_DEADLINE_SECONDS
+            with ThreadPoolExecutor(max_workers=max(1, min(ADB_PULL_WORKERS, len(pull_groups)))) as executor:
+                futures = [
+                    executor.submit(self._run_pull_jobs, adb_cmd, jobs, deadline)
+                    for jobs in pull_groups.values()
+                ]
+                for future in futures:
+                    for path, dest_path, is_dir in future.result():
+                        if not is_dir:
+                            result[path] = str(dest_path)
                             continue
-                        dest_path = media_dir
-                    else:
-                        dest_path = acquisition_dir / Path(path).name
-                    
-                    if dest_path.exists() and dest_path.is_dir():
-                        shutil.rmtree(dest_path)
-                    pull_cmd = adb_cmd + ["pull", path, str(dest_path)]
-                    
-                    proc = subprocess.run(pull_cmd, capture_output=True, text=True, timeout=300)
-                    
-                    if proc.returncode == 0 and dest_path.exists():
                         if "Databases" in path:
                             acquired_dirs.append((path, dest_path))
                         if "Media" in path:
                             result[path] = str(dest_path)
-                        logger.info(f"✓ Acquired directory: {path} -> {dest_path}")
-                    else:
-                        error_msg = proc.stderr.strip() if proc.stderr else proc.stdout.strip()
-                        if "Permission denied" in error_msg or "permission" in error_msg.lower():
-                            logger.warning(f"Permission denied for {path} (may require root)")
-                        else:
-                            logger.debug(f"Could not acquire directory {path}: {error_msg}")
-                    
-                except subprocess.TimeoutExpired:
-                    logger.warning(f"Timeout acquiring directory {path}")
-                except Exception as e:
-                    logger.debug(f"Could not acquire directory {path}: {e}")
-            
-            target_files = [
-                "msgstore.db",
-                "msgstore.db.crypt12",
-                "msgstore.db.crypt14",
-                "msgstore.db.crypt15",
-                "wa.db",
-                "axolotl.db",
-                "key"
-            ]
             
             for remote_dir, local_dir in acquired_dirs:
                 if not local_dir.exists() or not local_dir.is_dir():
                     continue
                 for root, _, files in os.walk(local_dir):
                     for file in files:
-                        if file in target_files or file.startswith("msgstore-") or file.endswith(".crypt12") or file.endswith(".crypt14") or file.endswith(".crypt15"):
-                            local_file = Path(root) / file
-                            rel_path = local_file.relative_to(local_dir).as_posix()
+                        if file in LOCAL_TARGET_FILES or file.startswith("msgstore-") or file.endswith(ADB_TARGET_SUFFIXES):
+                            local_file = os.path.join(root, file)
+                            rel_path = os.path.relpath(local_file, local_dir).replace(os.sep, "/")
                             remote_file = f"{remote_dir.rstrip('/')}/{rel_path}"
                             if remote_file not in result:
-                                result[remote_file] = str(local_file)
+                                result[remote_file] = local_file
                                 logger.info(f"✓ Indexed: {remote_file} -> {local_file}")
             
             if not result:
@@ -320,17 +473,293 @@ class WhatsAppAcquirer:
             
             return result
             
-        except FileNotFoundError:
-            raise RuntimeError(
-                "ADB not found. Please install Android SDK Platform Tools:\n"
-                "  macOS: brew install android-platform-tools\n"
-                "  Linux: sudo apt-get install adb\n"
-                "  Or download from: https://developer.android.com/studio/releases/platform-tools"
-            )
         except Exception as e:
             logger.error(f"ADB acquisition failed: {e}")
             raise
 
+    async def acquire_from_android_adb_async(
+        self,
+        device_id: Optional[str] = None,
+        include_media: bool = False
+    ) -> Dict[str, str]:
+        """
+        Awaitable version of acquire_from_android_adb().
+        
+        The acquisition runs in the event loop's default executor, so the loop
+        (e.g. a GUI or server) keeps running while adb transfers data.
+        
+        Args:
+            device_id: Optional device ID if multiple devices connected
+            include_media: Whether to pull the WhatsApp Media folders
+            
+        Returns:
+            Dictionary with paths to acquired files
+        """
+        # run_in_executor rather than asyncio.to_thread, which needs Python 3.9
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.acquire_from_android_adb, device_id, include_media)
+
+    @staticmethod
+    def _fast_copy(src: str, dst: str) -> int:
+        """
+        Copy a single file without moving data through userspace, preserving metadata.
+        
+        On Linux the data is copied with copy_file_range(2), which can reflink
+        on Btrfs/XFS, falling back to sendfile(2) when the kernel or filesystem
+        does not support it (e.g. cross-filesystem copies on older kernels) or
+        stops before the end of the file.
+        Other platforms use shutil.copyfile.
+        
+        Args:
+            src: Source file
+            dst: Destination file
+            
+        Returns:
+            Number of bytes copied
+        """
+        if not (sys.platform.startswith("linux") and hasattr(os, "sendfile")):
+            shutil.copyfile(src, dst)
+            shutil.copystat(src, dst)
+            return os.path.getsize(dst)
+        
+        src_fd = os.open(src, os.O_RDONLY)
+        try:
+            dst_fd = os.open(dst, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+            try:
+                size = os.fstat(src_fd).st_size
+                offset = 0
+                if hasattr(os, "copy_file_range"):
+                    try:
+                        # Explicit offsets leave both file positions untouched,
+                        # so sendfile can carry on from wherever this stops
+                        while offset < size:
+                            copied = os.copy_file_range(src_fd, dst_fd, size - offset, offset, offset)
+                            if copied == 0:
+                                break
+                            offset += copied
+                    except OSError:
+                        pass
+                # Finish with sendfile when copy_file_range is unsupported or
+                # stopped short (some filesystems copy only part of a range).
+                # sendfile writes at the destination's file position.
+                if offset < size:
+                    os.lseek(dst_fd, offset, os.SEEK_SET)
+                while offset < size:
+                    sent = os.sendfile(dst_fd, src_fd, offset, size - offset)
+                    if sent == 0:
+                        break
+                    offset += sent
+            finally:
+                os.close(dst_fd)
+        finally:
+            os.close(src_fd)
+        shutil.copystat(src, dst)
+        return offset
+
+    @staticmethod
+    def _copy_and_hash(src: str, dst: str) -> Tuple[int, str]:
+        """
+        Copy a single file and compute its SHA-256 from the same read, preserving metadata.
+        
+        Args:
+            src: Source file
+            dst: Destination file
+            
+        Returns:
+            Tuple of (number of bytes copied, SHA-256 hex digest)
+        """
+        sha256_hash = hashlib.sha256()
+        buf = bytearray(COPY_HASH_BUFFER_SIZE)
+        view = memoryview(buf)
+        size = 0
+        with open(src, "rb", buffering=0) as fsrc, open(dst, "wb", buffering=0) as fdst:
+            while n := fsrc.readinto(buf):
+                chunk = view[:n]
+                sha256_hash.update(chunk)
+                written = 0
+                while written < n:
+                    written += fdst.write(chunk[written:])
+                size += n
+        shutil.copystat(src, dst)
+        return size, sha256_hash.hexdigest()
+
+    @staticmethod
+    def _is_rotational(path: str) -> bool:
+        """
+        Best-effort check whether a path lives on a spinning disk (Linux only).
+        
+        Args:
+            path: File or directory on the device to check
+            
+        Returns:
+            True if the kernel reports the block device as rotational
+        """
+        if not sys.platform.startswith("linux"):
+            return False
+        try:
+            dev = os.stat(path).st_dev
+            block_dir = f"/sys/dev/block/{os.major(dev)}:{os.minor(dev)}"
+            # Partitions keep the queue settings on their parent disk
+            for queue_dir in (block_dir, os.path.join(block_dir, "..")):
+                flag = os.path.join(queue_dir, "queue", "rotational")
+                if os.path.exists(flag):
+                    with open(flag) as f:
+                        return f.read().strip() == "1"
+        except OSError:
+            pass
+        return False
+
+    def _copy_workers(self, source_dir: str) -> int:
+        """
+        Choose the number of concurrent copies for a source directory.
+        
+        Args:
+            source_dir: Directory the files are copied from
+            
+        Returns:
+            Number of copy workers
+        """
+        if self._is_rotational(source_dir):
+            return COPY_ROTATIONAL_WORKERS
+        return min(COPY_MAX_WORKERS, os.cpu_count() or 4)
+
+    def _copy_files(
+        self,
+        pairs: List[Tuple[str, str]],
+        max_workers: int = 8,
+        hash_destinations: frozenset = frozenset(),
+    ) -> Tuple[Dict[str, int], Dict[str, str]]:
+        """
+        Copy a batch of files concurrently, preserving timestamps and permissions.
+        
+        When several pairs share a destination only the last one is copied,
+        matching the result of a sequence of individual copies. Progress is
+        logged every COPY_PROGRESS_FILES files or COPY_PROGRESS_SECONDS seconds
+        rather than once per file.
+        
+        Args:
+            pairs: List of (source, destination) file paths
+            max_workers: Maximum number of concurrent copies
+            hash_destinations: Destinations whose SHA-256 is computed while copying
+            
+        Returns:
+            Tuple of (bytes copied per destination, SHA-256 per hashed destination)
+        """
+        by_destination: Dict[str, str] = {}
+        for src, dst in pairs:
+            by_destination.pop(dst, None)
+            by_destination[dst] = src
+        sizes: Dict[str, int] = {}
+        hashes: Dict[str, str] = {}
+        if not by_destination:
+            return sizes, hashes
+        
+        total = len(by_destination)
+        copied = 0
+        copied_bytes = 0
+        last_report = time.monotonic()
+        debug_enabled = logger.isEnabledFor(logging.DEBUG)
+        with ThreadPoolExecutor(max_workers=min(max_workers, total)) as executor:
+            futures = {
+                executor.submit(
+                    self._copy_and_hash if dst in hash_destinations else self._fast_copy, src, dst
+                ): dst
+                for dst, src in by_destination.items()
+            }
+            for future in as_completed(futures):
+                dst = futures[future]
+                if dst in hash_destinations:
+                    size, hashes[dst] = future.result()
+                else:
+                    size = future.result()
+                sizes[dst] = size
+                copied_bytes += size
+                copied += 1
+                if debug_enabled:
+                    logger.debug("Copied %s", dst)
+                now = time.monotonic()
+                if copied % COPY_PROGRESS_FILES == 0 or now - last_report >= COPY_PROGRESS_SECONDS:
+                    logger.info("Copied %d/%d files (%.1f MB)", copied, total, copied_bytes / 1e6)
+                    last_report = now
+        
+        if total >= COPY_PROGRESS_FILES:
+            logger.info("Copied %d files (%.1f MB)", copied, copied_bytes / 1e6)
+        return sizes, hashes
+
+    def _iter_local_targets(self, directory: str) -> Iterator[str]:
+        """
+        Yield WhatsApp database and key files below a directory.
+        
+        Uses os.scandir so file type checks come from the cached directory
+        entry. Files are yielded top-down in the same order as os.walk.
+        
+        Args:
+            directory: Directory to search
+            
+        Yields:
+            Paths of matching files
+        """
+        subdirs: List[str] = []
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.is_dir():
+                    if not entry.is_symlink():
+                        subdirs.append(entry.path)
+                elif (
+                    entry.name in LOCAL_TARGET_FILES
+                    or entry.name.startswith("msgstore-")
+                    or entry.name.endswith(LOCAL_TARGET_SUFFIXES)
+                ):
+                    yield entry.path
+        for subdir in subdirs:
+            yield from self._iter_local_targets(subdir)
+
+    def _plan_tree_copy(
+        self, src_root: str, dst_root: str
+    ) -> Tuple[List[Tuple[str, str]], List[Tuple[str, str]]]:
+        """
+        Recreate a directory tree and list the file copies needed to fill it.
+        
+        Uses os.scandir so entry types come from the cached directory entry.
+        Symlinks are followed, as with shutil.copytree, except into a directory
+        already being copied. Entries that are not regular files or directories
+        (FIFOs, sockets, devices, broken links) are skipped with a warning, as
+        opening them for copying could block or fail.
+        
+        Args:
+            src_root: Directory to copy
+            dst_root: Destination directory, created with all subdirectories
+            
+        Returns:
+            Tuple of (source, destination) file paths and (source, destination)
+            directories; copy the directories' metadata once the files are in place
+        """
+        pairs: List[Tuple[str, str]] = []
+        directories: List[Tuple[str, str]] = []
+        root_stat = os.stat(src_root)
+        visited = {(root_stat.st_dev, root_stat.st_ino)}
+        pending = [(src_root, dst_root)]
+        while pending:
+            src_dir, dst_dir = pending.pop()
+            os.makedirs(dst_dir, exist_ok=True)
+            directories.append((src_dir, dst_dir))
+            with os.scandir(src_dir) as entries:
+                for entry in entries:
+                    dst_path = os.path.join(dst_dir, entry.name)
+                    if entry.is_dir():
+                        entry_stat = entry.stat()
+                        key = (entry_stat.st_dev, entry_stat.st_ino)
+                        if key in visited:
+                            logger.warning(f"Skipping directory link loop: {entry.path}")
+                            continue
+                        visited.add(key)
+                        pending.append((entry.path, dst_path))
+                    elif entry.is_file():
+                        pairs.append((entry.path, dst_path))
+                    else:
+                        logger.warning(f"Skipping special or broken file: {entry.path}")
+        return pairs, directories
+
     def acquire_from_files(self, source_dir: str) -> Dict[str, str]:
         """
         Acquire WhatsApp data from local file system.
@@ -343,6 +772,8 @@ class WhatsAppAcquirer:
         """
         logger.info(f"Starting file acquisition from {source_dir}")
         result = {}
+        self._last_acquired = None
+        self._last_summary = None
         
         source_path = Path(source_dir).resolve()
         if not source_path.exists():
@@ -354,117 +785,272 @@ class WhatsAppAcquirer:
         acquisition_dir = self.output_dir / "local_files"
         acquisition_dir.mkdir(parents=True, exist_ok=True)
         
-        # Files to look for
-        target_files = [
-            "msgstore.db",
-            "msgstore.db.crypt12",
-            "msgstore.db.crypt14",
-            "msgstore.db.crypt15",
-            "wa.db",
-            "axolotl.db",
-            "key"
-        ]
+        media_dir = source_path / "Media"
         
-        # Walk through directory
-        for root, _, files in os.walk(source_path):
-            for file in files:
-                if file in target_files or file.startswith("msgstore-") or file.endswith(".crypt14") or file.endswith(".crypt15"):
-                    source_file = Path(root) / file
-                    dest_file = acquisition_dir / file
-                    
-                    shutil.copy2(source_file, dest_file)
-                    result[str(source_file)] = str(dest_file)
-                    logger.info(f"✓ Acquired: {file}")
+        # Plan all copies first so they can be issued as one batch
+        copy_pairs: List[Tuple[str, str]] = []
+        
+        # Walk through directory, Media included so matching files there are
+        # still acquired and hashed individually; Media is also copied whole below.
+        # Same-named files from different folders (e.g. WhatsApp and WhatsApp
+        # Business) keep the first copy's name and prefix the rest with their
+        # parent folder, so no evidence file overwrites another.
+        used_names = set()
+        for source_file in self._iter_local_targets(str(source_path)):
+            file = os.path.basename(source_file)
+            dest_name = file
+            if dest_name in used_names:
+                parent_name = self._sanitize_device_label(os.path.basename(os.path.dirname(source_file)))
+                dest_name = f"{parent_name}_{file}"
+                counter = 2
+                while dest_name in used_names:
+                    dest_name = f"{parent_name}_{counter}_{file}"
+                    counter += 1
+            used_names.add(dest_name)
+            dest_file = os.path.join(acquisition_dir, dest_name)
+            copy_pairs.append((source_file, dest_file))
+            result[source_file] = dest_file
         
         # Also look for Media folder
-        media_dir = source_path / "Media"
-        if media_dir.exists() and media_dir.is_dir():
-            dest_media = acquisition_dir / "Media"
+        dest_media = acquisition_dir / "Media"
+        media_found = media_dir.exists() and media_dir.is_dir()
+        media_pairs_start = len(copy_pairs)
+        media_dirs: List[Tuple[str, str]] = []
+        if media_found:
             if dest_media.exists():
                 shutil.rmtree(dest_media)
-            shutil.copytree(media_dir, dest_media)
+            media_pairs, media_dirs = self._plan_tree_copy(str(media_dir), str(dest_media))
+            copy_pairs.extend(media_pairs)
+        
+        # Evidence files are hashed from the same read that copies them;
+        # Media keeps the in-kernel copy
+        copied_sizes, copied_hashes = self._copy_files(
+            copy_pairs,
+            max_workers=self._copy_workers(str(source_path)),
+            hash_destinations=frozenset(result.values()),
+        )
+        # Copying files in touches their folders, so folder times are set last
+        for src_dir, dst_dir in reversed(media_dirs):
+            shutil.copystat(src_dir, dst_dir)
+        
+        # The copy already reported every size and hash, so the summary needs no second pass
+        summary = self._new_summary()
+        for source_file, dest_file in result.items():
+            logger.info(f"✓ Acquired: {os.path.basename(source_file)}")
+            self._add_file_to_summary(summary, dest_file, copied_sizes[dest_file])
+            summary["sha256"][dest_file] = copied_hashes[dest_file]
+        
+        if media_found:
             result[str(media_dir)] = str(dest_media)
             logger.info(f"✓ Acquired: Media folder")
+            summary["total_size_bytes"] += sum(
+                copied_sizes[dst] for _, dst in copy_pairs[media_pairs_start:]
+            )
+            summary["media_files"].append(str(dest_media))
             
         if not result:
             logger.warning("No WhatsApp databases found in input directory")
+        
+        summary["total_files"] = len(result)
+        self._last_acquired = dict(result)
+        self._last_summary = summary
+        self._last_summary_hashed = True
             
         return result
 
-    def get_acquisition_summary(self, acquired_files: Dict[str, str]) -> Dict[str, Any]:
+    @staticmethod
+    def _new_summary() -> Dict[str, Any]:
+        """Return an empty acquisition summary"""
+        return {
+            "total_files": 0,
+            "total_size_bytes": 0,
+            "databases": [],
+            "encrypted_databases": [],
+            "media_files": [],
+            "keys": [],
+            "others": [],
+            "sha256": {}
+        }
+
+    @staticmethod
+    def _add_file_to_summary(summary: Dict[str, Any], path: str, size: int) -> None:
+        """Count a regular file in an acquisition summary under its category"""
+        summary["total_size_bytes"] += size
+        
+        # Categorize; stem and extension split like os.path.splitext, so
+        # dot-files such as ".jpg" have no extension
+        name_lower = os.path.basename(path).lower()
+        stem, _, extension = name_lower.rpartition(".")
+        if "crypt" in name_lower:
+            summary["encrypted_databases"].append(path)
+        elif name_lower.endswith(".db"):
+            summary["databases"].append(path)
+        elif name_lower == "key":
+            summary["keys"].append(path)
+        elif extension in MEDIA_FILE_EXTENSIONS and stem.lstrip("."):
+            summary["media_files"].append(path)
+        else:
+            summary["others"].append(path)
+
+    @staticmethod
+    def _dir_size(directory: str) -> int:
+        """
+        Total size of the files below a directory.
+        
+        Walks with os.scandir and an explicit stack; symlinked directories
+        are not descended into, as with os.walk.
+        
+        Args:
+            directory: Directory to measure
+            
+        Returns:
+            Size in bytes
+        """
+        total = 0
+        pending = [directory]
+        while pending:
+            with os.scandir(pending.pop()) as entries:
+                for entry in entries:
+                    if entry.is_dir():
+                        if not entry.is_symlink():
+                            pending.append(entry.path)
+                    else:
+                        total += entry.stat().st_size
+        return total
+
+    @staticmethod
+    def _sha256_file(path: str) -> str:
+        """SHA-256 hex digest of a file"""
+        with open(path, "rb") as f:
+            if hasattr(hashlib, "file_digest"):
+                # Python 3.11+: hashes in C with the GIL released
+                return hashlib.file_digest(f, "sha256").hexdigest()
+            sha256_hash = hashlib.sha256()
+            buf = bytearray(COPY_HASH_BUFFER_SIZE)
+            view = memoryview(buf)
+            while n := f.readinto(buf):
+                sha256_hash.update(view[:n])
+            return sha256_hash.hexdigest()
+
+    def get_recorded_hashes(self, acquired_files: Dict[str, str]) -> Dict[str, str]:
+        """
+        SHA-256 already computed for acquired files, without reading them again.
+        
+        acquire_from_files() hashes database and key files from the same read
+        that copies them; ADB pulls record no hashes.
+        
+        Args:
+            acquired_files: Dictionary of acquired files
+            
+        Returns:
+            Dictionary mapping acquired file path to SHA-256, empty when the
+            last remembered summary does not describe acquired_files
+        """
+        if self._last_summary is None or acquired_files != self._last_acquired:
+            return {}
+        return dict(self._last_summary["sha256"])
+
+    def get_acquisition_summary(self, acquired_files: Dict[str, str], compute_hashes: bool = False) -> Dict[str, Any]:
         """
         Get detailed summary of acquisition.
         
+        The summary is remembered for the acquisition result it describes:
+        when acquired_files is unchanged since the last acquire_from_files()
+        or get_acquisition_summary() call, it is returned without touching
+        the file system again. acquire_from_files() hashes files while copying
+        them, so its summary always includes their SHA-256.
+        
         Args:
             acquired_files: Dictionary of acquired files
+            compute_hashes: Read every acquired file to hash it when the hashes
+                were not already computed during the copy (e.g. after ADB pulls)
             
         Returns:
-            Dictionary with acquisition statistics and details
+            Dictionary with acquisition statistics and details, including the
+            SHA-256 of acquired files (Media folders excluded) when known
         """
-        summary = {
-            "total_files": len(acquired_files),
-            "total_size_bytes": 0,
-            "databases": [],
-            "encrypted_databases": [],
-            "media_files": [],
-            "keys": [],
-            "others": []
-        }
+        if (self._last_summary is not None and acquired_files == self._last_acquired
+                and (self._last_summary_hashed or not compute_hashes)):
+            return copy.deepcopy(self._last_summary)
+        
+        summary = self._new_summary()
+        summary["total_files"] = len(acquired_files)
         
-        for name, path in acquired_files.items():
-            file_path = Path(path)
-            if file_path.exists():
-                if file_path.is_file():
-                    size = file_path.stat().st_size
-                    summary["total_size_bytes"] += size
+        for path in acquired_files.values():
+            # One stat per entry answers existence, type and size together
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            
+            if stat.S_ISREG(st.st_mode):
+                self._add_file_to_summary(summary, path, st.st_size)
+                if compute_hashes:
+                    summary["sha256"][path] = self._sha256_file(path)
                     
-                    # Categorize
-                    name_lower = file_path.name.lower()
-                    if "crypt" in name_lower:
-                        summary["encrypted_databases"].append(str(file_path))
-                    elif name_lower.endswith(".db"):
-                        summary["databases"].append(str(file_path))
-                    elif name_lower == "key":
-                        summary["keys"].append(str(file_path))
-                    elif file_path.suffix.lower().strip('.') in ["jpg", "jpeg", "png", "mp4", "3gp", "opus", "webp"]:
-                        summary["media_files"].append(str(file_path))
-                    else:
-                        summary["others"].append(str(file_path))
-                        
-                elif file_path.is_dir():
-                    # Directory (e.g. Media)
-                    dir_size = 0
-                    for root, _, files in os.walk(file_path):
-                        for f in files:
-                            fp = Path(root) / f
-                            dir_size += fp.stat().st_size
-                    summary["total_size_bytes"] += dir_size
-                    summary["media_files"].append(str(file_path)) # Assume dirs are media folders
+            elif stat.S_ISDIR(st.st_mode):
+                # Directory (e.g. Media)
+                summary["total_size_bytes"] += self._dir_size(path)
+                summary["media_files"].append(path) # Assume dirs are media folders
+        
+        self._last_acquired = dict(acquired_files)
+        self._last_summary = copy.deepcopy(summary)
+        self._last_summary_hashed = compute_hashes
                     
         return summary
 
-    def verify_database(self, db_path: str) -> bool:
+    def verify_database(self, db_path: str, deep: bool = True) -> bool:
         """
         Verify if a file is a valid SQLite database.
         
+        Results are cached per (path, mtime, size), so unchanged files are
+        only checked once.
+        
         Args:
             db_path: Path to database file
+            deep: Also open the database and read its schema; with False only
+                the 16-byte SQLite header is checked
             
         Returns:
             True if valid SQLite database, False otherwise
         """
-        if not os.path.exists(db_path):
+        try:
+            st = os.stat(db_path)
+        except OSError:
             return False
-            
+        if not self._has_sqlite_header_cached(str(db_path), st.st_mtime_ns, st.st_size):
+            return False
+        if not deep:
+            return True
+        return self._verify_database_cached(str(db_path), st.st_mtime_ns, st.st_size)
+
+    @staticmethod
+    @lru_cache(maxsize=256)
+    def _has_sqlite_header_cached(db_path: str, mtime_ns: int, size: int) -> bool:
+        """Check a file starts with the SQLite magic; the stat fields only serve as the cache key."""
         try:
-            # Open in read-only mode to check validity
-            conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
-            cursor = conn.cursor()
-            cursor.execute("PRAGMA schema_version")
-            conn.close()
+            with open(db_path, "rb") as f:
+                return f.read(16) == SQLITE_HEADER_MAGIC
+        except OSError as e:
+            logger.debug(f"Database verification failed: {e}")
+            return False
+
+    @staticmethod
+    @lru_cache(maxsize=256)
+    def _verify_database_cached(db_path: str, mtime_ns: int, size: int) -> bool:
+        """Open a database with a valid header; the stat fields only serve as the cache key."""
+        try:
+            # Open read-only and immutable so no journal or lock file is created
+            # next to the evidence copy; schema_version only reads the header page
+            uri = f"{Path(db_path).resolve().as_uri()}?mode=ro&immutable=1"
+            conn = sqlite3.connect(uri, uri=True)
+            try:
+                conn.execute("PRAGMA schema_version").fetchone()
+            finally:
+                conn.close()
             return True
         except sqlite3.DatabaseError:
             return False
         except Exception as e:
-            self.logger.debug(f"Database verification failed: {e}")
+            logger.debug(f"Database verification failed: {e}")
             return False
@@ -7,11 +7,13 @@ WhatsApp Database Decryption Module
 Supports decryption of crypt12, crypt14, and crypt15 encrypted WhatsApp databases.
 """
 
+import mmap
 import os
 import zlib
 from enum import Enum
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional, Tuple
+from typing import Callable, List, Optional, Tuple
 import logging
 
 # Try to import Crypto - support both pycryptodome and pycryptodomex
@@ -26,8 +28,100 @@ except ImportError:
             "Install with: pip install pycryptodome"
         )
 
+# PyCryptodome already decrypts with AES-NI and PCLMULQDQ GHASH and remains the
+# required backend. cryptography is an optional extra, never an install
+# requirement: when present, its OpenSSL stitched AES-GCM kernels are faster still
+try:
+    from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+except ImportError:
+    Cipher = None
+
+# Inflate with ISA-L when available; isal_zlib mirrors the zlib decompression API.
+# Compression stays on zlib so that levels keep their usual 0-9 meaning.
+try:
+    from isal import isal_zlib as inflate_zlib
+except ImportError:
+    inflate_zlib = zlib
+
 logger = logging.getLogger(__name__)
 
+# Encrypted backups are decrypted and inflated this many bytes at a time
+STREAM_CHUNK_SIZE = 1024 * 1024
+
+# Inflated output is small and bursty per chunk; batch it into large writes
+OUTPUT_BUFFER_SIZE = 4 * 1024 * 1024
+
+
+@lru_cache(maxsize=32)
+def _read_key_file(path: str, device: int, inode: int, mtime_ns: int, size: int) -> bytes:
+    """
+    Read the encryption key from a key file.
+    
+    Cached on the file's identity and modification stamp so that decryptors
+    created for many backups share one read of the same key file.
+    
+    Args:
+        path: Resolved path to key file
+        device: Device number of the key file
+        inode: Inode number of the key file
+        mtime_ns: Modification time of the key file in nanoseconds
+        size: Size of the key file in bytes
+        
+    Returns:
+        Encryption key bytes
+    """
+    with open(path, "rb") as f:
+        key_data = f.read()
+    
+    # Key is typically at offset 126 in the key file
+    if len(key_data) >= 158:
+        return key_data[126:]
+    elif len(key_data) >= 32:
+        # Some key files might just contain the key directly
+        return key_data[-32:]
+    else:
+        raise ValueError(f"Invalid key file size: {len(key_data)} bytes")
+
+
+def _gcm_decryptor(key: bytes, iv: bytes) -> Callable[[bytes], bytes]:
+    """
+    Create an incremental AES-GCM decrypt function.
+    
+    The authentication tag is not checked, matching the PyCryptodome path
+    the decryptor has always used.
+    
+    Args:
+        key: AES key
+        iv: GCM nonce
+        
+    Returns:
+        Function decrypting successive ciphertext chunks
+    """
+    if Cipher is not None:
+        return Cipher(algorithms.AES(key), modes.GCM(iv)).decryptor().update
+    return AES.new(key, mode=AES.MODE_GCM, nonce=iv).decrypt
+
+
+def _advise_sequential(fd: int, mapping: Optional[mmap.mmap] = None):
+    """
+    Tell the kernel a file is about to be read once from start to end.
+    
+    Enables aggressive readahead where the platform supports it; a no-op
+    elsewhere (e.g. Windows).
+    
+    Args:
+        fd: Open file descriptor
+        mapping: Optional memory map of the file
+    """
+    try:
+        if hasattr(os, "posix_fadvise"):
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_SEQUENTIAL)
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+        if mapping is not None and hasattr(mmap, "MADV_SEQUENTIAL"):
+            mapping.madvise(mmap.MADV_SEQUENTIAL)
+    except OSError as e:
+        logger.debug(f"Readahead advice not applied: {e}")
+
 
 class EncryptionType(Enum):
     """WhatsApp encryption types"""
@@ -44,6 +138,13 @@ class WhatsAppDecryptor:
     Supports crypt12, crypt14, and crypt15 encryption formats.
     """
     
+    # Encryption type implied by a backup's file extension
+    SUFFIX_TYPES = {
+        ".crypt12": EncryptionType.CRYPT12,
+        ".crypt14": EncryptionType.CRYPT14,
+        ".crypt15": EncryptionType.CRYPT15,
+    }
+    
     def __init__(self, key_file: str):
         """
         Initialize decryptor with key file.
@@ -64,17 +165,88 @@ class WhatsAppDecryptor:
         Returns:
             Encryption key bytes
         """
-        with open(self.key_file, "rb") as f:
-            key_data = f.read()
+        # Re-read only when the key file itself has changed
+        stat = self.key_file.stat()
+        return _read_key_file(
+            str(self.key_file.resolve()), stat.st_dev, stat.st_ino, stat.st_mtime_ns, stat.st_size
+        )
+    
+    @staticmethod
+    def _read_iv(encrypted_file: str, start: int) -> bytes:
+        """Read the 16-byte GCM nonce stored at an offset of an encrypted backup"""
+        with open(encrypted_file, "rb") as f:
+            f.seek(start)
+            return f.read(16)
+    
+    def _decrypt_range(self, encrypted_file: str, output_file: str, iv: bytes, start: int, end: int):
+        """
+        Decrypt and inflate part of an encrypted backup into a file, one chunk at a time.
         
-        # Key is typically at offset 126 in the key file
-        if len(key_data) >= 158:
-            return key_data[126:]
-        elif len(key_data) >= 32:
-            # Some key files might just contain the key directly
-            return key_data[-32:]
-        else:
-            raise ValueError(f"Invalid key file size: {len(key_data)} bytes")
+        The backup is memory-mapped, so peak memory stays around the inflated
+        chunk instead of several copies of the whole database. A partially written output file
+        is removed when decryption fails.
+        
+        Args:
+            encrypted_file: Path to encrypted database
+            output_file: Path to output decrypted database
+            iv: GCM nonce
+            start: Offset of the first encrypted byte
+            end: Offset just past the last encrypted byte
+        """
+        decrypt = _gcm_decryptor(self.key, iv)
+        inflater = inflate_zlib.decompressobj()
+        try:
+            with open(encrypted_file, "rb") as fin, open(output_file, "wb", buffering=OUTPUT_BUFFER_SIZE) as fout:
+                # Ciphertext chunks are memoryview slices of the mapped file,
+                # so they reach AES without an intermediate copy
+                with mmap.mmap(fin.fileno(), 0, access=mmap.ACCESS_READ) as mm, memoryview(mm) as view:
+                    _advise_sequential(fin.fileno(), mm)
+                    for pos in range(start, end, STREAM_CHUNK_SIZE):
+                        if inflater.eof:
+                            break
+                        with view[pos:min(pos + STREAM_CHUNK_SIZE, end)] as chunk:
+                            fout.write(inflater.decompress(decrypt(chunk)))
+                fout.write(inflater.flush())
+            if not inflater.eof:
+                raise zlib.error("Error -5 while decompressing data: incomplete or truncated stream")
+        except BaseException:
+            Path(output_file).unlink(missing_ok=True)
+            raise
+    
+    def _crypt14_offset_candidates(self, encrypted_file: str, iv: bytes, offsets: range) -> List[int]:
+        """
+        Find payload offsets whose decrypted prefix is a valid zlib header.
+        
+        GCM encrypts with a counter keystream, so the first two plaintext bytes
+        of each candidate payload can be recovered without decrypting the rest.
+        
+        Args:
+            encrypted_file: Path to encrypted database
+            iv: GCM nonce
+            offsets: Candidate payload offsets, in the order to try them
+            
+        Returns:
+            Offsets whose prefix passes the zlib header check
+        """
+        with open(encrypted_file, "rb") as f:
+            f.seek(offsets[0])
+            window = f.read(offsets[-1] - offsets[0] + 2)
+        
+        # Every candidate uses the same key and nonce, hence the same keystream,
+        # so one cipher is enough to unmask all prefixes
+        keystream = _gcm_decryptor(self.key, iv)(bytes(2))
+        
+        candidates = []
+        for offset in offsets:
+            prefix = window[offset - offsets[0]:offset - offsets[0] + 2]
+            if len(prefix) < 2:
+                continue
+            cmf, flg = prefix[0] ^ keystream[0], prefix[1] ^ keystream[1]
+            # RFC 1950: deflate with a window of at most 32K, no preset dictionary
+            # and a header check divisible by 31
+            if cmf & 0x0F == 8 and cmf >> 4 <= 7 and not flg & 0x20 and (cmf * 256 + flg) % 31 == 0:
+                candidates.append(offset)
+        return candidates
     
     def detect_encryption_type(self, db_file: str) -> EncryptionType:
         """
@@ -87,26 +259,23 @@ class WhatsAppDecryptor:
             EncryptionType enum
         """
         db_path = Path(db_file)
-        if db_path.suffix == ".crypt12":
-            return EncryptionType.CRYPT12
-        elif db_path.suffix == ".crypt14":
-            return EncryptionType.CRYPT14
-        elif db_path.suffix == ".crypt15":
-            return EncryptionType.CRYPT15
-        else:
-            # Try to detect by file content
-            try:
-                with open(db_path, "rb") as f:
-                    header = f.read(16)
-                    # Check for SQLite magic number
-                    if header[:16] == b"SQLite format 3\x00":
-                        return EncryptionType.UNENCRYPTED
-                    # Crypt14/15 have specific headers
-                    if header[:3] == b"\x00\x00\x00":
-                        return EncryptionType.CRYPT14
-            except Exception:
-                pass
-            return EncryptionType.UNENCRYPTED
+        enc_type = self.SUFFIX_TYPES.get(db_path.suffix)
+        if enc_type is not None:
+            return enc_type
+        
+        # Try to detect by file content
+        try:
+            with open(db_path, "rb") as f:
+                header = f.read(16)
+                # Check for SQLite magic number
+                if header.startswith(b"SQLite format 3\x00"):
+                    return EncryptionType.UNENCRYPTED
+                # Crypt14/15 have specific headers
+                if header.startswith(b"\x00\x00\x00"):
+                    return EncryptionType.CRYPT14
+        except Exception:
+            pass
+        return EncryptionType.UNENCRYPTED
     
     def decrypt_crypt12(self, encrypted_file: str, output_file: str) -> bool:
         """
@@ -122,26 +291,15 @@ class WhatsAppDecryptor:
         try:
             logger.info(f"Decrypting crypt12: {encrypted_file}")
             
-            with open(encrypted_file, "rb") as f:
-                db_data = f.read()
-            
-            if len(db_data) < 87:
+            file_size = os.path.getsize(encrypted_file)
+            if file_size < 87:
                 raise ValueError("Database file too small")
             
             # Crypt12 format: header (51) + IV (16) + encrypted data + footer (20)
-            iv = db_data[51:67]
-            encrypted_data = db_data[67:-20]
-            
-            # Decrypt using AES-GCM
-            cipher = AES.new(self.key, mode=AES.MODE_GCM, nonce=iv)
-            decrypted_data = cipher.decrypt(encrypted_data)
+            iv = self._read_iv(encrypted_file, 51)
             
-            # Decompress
-            decompressed = zlib.decompress(decrypted_data)
-            
-            # Write decrypted database
-            with open(output_file, "wb") as f:
-                f.write(decompressed)
+            # Decrypt using AES-GCM, decompress and write the decrypted database
+            self._decrypt_range(encrypted_file, output_file, iv, 67, file_size - 20)
             
             logger.info(f"Successfully decrypted to: {output_file}")
             return True
@@ -164,36 +322,30 @@ class WhatsAppDecryptor:
         try:
             logger.info(f"Decrypting crypt14: {encrypted_file}")
             
-            with open(encrypted_file, "rb") as f:
-                db_data = f.read()
-            
-            if len(db_data) < 195:
+            file_size = os.path.getsize(encrypted_file)
+            if file_size < 195:
                 raise ValueError("Database file too small")
             
             # Crypt14 format: header + IV (at offset 67:83) + encrypted data
             # Try different offsets as crypt14 has variable header size
-            iv = db_data[67:83]
+            iv = self._read_iv(encrypted_file, 67)
             
-            # Try offsets from 185 to 195
-            for offset in range(185, 196):
+            # Try offsets from 185 to 195, skipping those whose first plaintext
+            # bytes cannot start a zlib stream
+            offsets = self._crypt14_offset_candidates(encrypted_file, iv, range(185, 196))
+            if not offsets:
+                raise ValueError("No crypt14 payload offset yields a zlib stream")
+            
+            for offset in offsets:
                 try:
-                    encrypted_data = db_data[offset:-20] if len(db_data) > offset + 20 else db_data[offset:]
-                    
-                    cipher = AES.new(self.key, mode=AES.MODE_GCM, nonce=iv)
-                    decrypted_data = cipher.decrypt(encrypted_data)
-                    
-                    # Try to decompress
-                    decompressed = zlib.decompress(decrypted_data)
-                    
-                    # Write decrypted database
-                    with open(output_file, "wb") as f:
-                        f.write(decompressed)
+                    end = file_size - 20 if file_size > offset + 20 else file_size
+                    self._decrypt_range(encrypted_file, output_file, iv, offset, end)
                     
                     logger.info(f"Successfully decrypted crypt14 with offset {offset} to: {output_file}")
                     return True
                     
-                except (zlib.error, ValueError, Exception) as e:
-                    if offset == 195:
+                except (inflate_zlib.error, ValueError, Exception) as e:
+                    if offset == offsets[-1]:
                         logger.error(f"Failed to decrypt crypt14 with all offsets: {e}")
                         raise
                     continue
@@ -222,23 +374,16 @@ class WhatsAppDecryptor:
             logger.info(f"Decrypting crypt15: {encrypted_file}")
             logger.warning("Crypt15 decryption is limited. Full support may require additional libraries.")
             
-            with open(encrypted_file, "rb") as f:
-                db_data = f.read()
+            file_size = os.path.getsize(encrypted_file)
             
             # Crypt15 uses a different format - this is a basic implementation
             # Full crypt15 support requires additional processing
             # For now, we'll attempt similar approach to crypt14
             
-            iv = db_data[67:83]
-            encrypted_data = db_data[195:-20] if len(db_data) > 215 else db_data[195:]
-            
-            cipher = AES.new(self.key, mode=AES.MODE_GCM, nonce=iv)
-            decrypted_data = cipher.decrypt(encrypted_data)
-            
-            decompressed = zlib.decompress(decrypted_data)
+            iv = self._read_iv(encrypted_file, 67)
+            end = file_size - 20 if file_size > 215 else file_size
             
-            with open(output_file, "wb") as f:
-                f.write(decompressed)
+            self._decrypt_range(encrypted_file, output_file, iv, 195, end)
             
             logger.info(f"Successfully decrypted crypt15 to: {output_file}")
             return True
@@ -295,7 +440,13 @@ class WhatsAppDecryptor:
         else:
             return None
     
-    def encrypt_crypt12(self, db_file: str, output_file: str, reference_encrypted: str) -> bool:
+    def encrypt_crypt12(
+        self,
+        db_file: str,
+        output_file: str,
+        reference_encrypted: str,
+        compression_level: int = 6
+    ) -> bool:
         """
         Encrypt database to crypt12 format.
         
@@ -303,6 +454,7 @@ class WhatsAppDecryptor:
             db_file: Path to unencrypted database
             output_file: Path to output encrypted database
             reference_encrypted: Path to existing encrypted database for format reference
+            compression_level: zlib level, 1 (fastest) to 9 (smallest); 6 matches zlib's default
             
         Returns:
             True if successful
@@ -312,24 +464,21 @@ class WhatsAppDecryptor:
             
             # Read reference encrypted file for header/footer
             with open(reference_encrypted, "rb") as f:
-                ref_data = f.read()
-            
-            header = ref_data[:51]
-            iv = ref_data[51:67]
-            footer = ref_data[-20:]
+                header = f.read(51)
+                iv = f.read(16)
+                f.seek(-20, os.SEEK_END)
+                footer = f.read(20)
             
-            # Read database to encrypt
-            with open(db_file, "rb") as f:
-                db_data = f.read()
-            
-            # Compress and encrypt
-            compressed = zlib.compress(db_data)
+            # Compress and encrypt the database a chunk at a time
+            deflater = zlib.compressobj(compression_level)
             cipher = AES.new(self.key, mode=AES.MODE_GCM, nonce=iv)
-            encrypted = cipher.encrypt(compressed)
-            
-            # Write encrypted database
-            with open(output_file, "wb") as f:
-                f.write(header + iv + encrypted + footer)
+            with open(db_file, "rb") as fin, open(output_file, "wb", buffering=OUTPUT_BUFFER_SIZE) as fout:
+                _advise_sequential(fin.fileno())
+                fout.write(header + iv)
+                while chunk := fin.read(STREAM_CHUNK_SIZE):
+                    fout.write(cipher.encrypt(deflater.compress(chunk)))
+                fout.write(cipher.encrypt(deflater.flush()))
+                fout.write(footer)
             
             logger.info(f"Successfully encrypted to: {output_file}")
             return True
@@ -9,15 +9,74 @@ Tracks all actions, user activities, and system events to maintain
 a verifiable audit trail for legal compliance.
 """
 
+import atexit
 import json
 import logging
+import os
+import queue
+import threading
+import time
+import weakref
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, Optional, Any
-import hashlib
+from collections import Counter
+from typing import Dict, Optional, Any, BinaryIO, TextIO, Tuple
+
+from .serialization import dump_document, dump_line, loads
 
 logger = logging.getLogger(__name__)
 
+# Most journal lines the background writer collects into one write
+JOURNAL_BATCH_SIZE = 256
+
+# Queued in place of a journal line to stop the background writer
+_STOP_WRITER = object()
+
+# Loggers not yet closed; held weakly so an abandoned logger can still be collected
+_OPEN_LOGGERS: "weakref.WeakSet[AuditLogger]" = weakref.WeakSet()
+
+
+@atexit.register
+def _close_open_loggers():
+    """Close every audit logger still open at interpreter exit"""
+    for audit_logger in list(_OPEN_LOGGERS):
+        audit_logger.close()
+
+
+def _write_journal(journal_queue: queue.Queue, journal: BinaryIO):
+    """
+    Append queued journal lines, batching whatever has queued up meanwhile.
+    
+    Runs on the logger's writer thread and takes no reference to the logger
+    itself, so the thread does not keep an abandoned logger alive.
+    """
+    while True:
+        batch = [journal_queue.get()]
+        while len(batch) < JOURNAL_BATCH_SIZE:
+            try:
+                batch.append(journal_queue.get_nowait())
+            except queue.Empty:
+                break
+        
+        try:
+            journal.writelines(line for line in batch if line is not _STOP_WRITER)
+            journal.flush()
+        except Exception as e:
+            logger.error(f"Could not write audit journal: {e}")
+        finally:
+            for _ in batch:
+                journal_queue.task_done()
+        
+        if _STOP_WRITER in batch:
+            return
+
+
+def _stop_journal_writer(journal_queue: queue.Queue, journal_writer: threading.Thread, journal: BinaryIO):
+    """Let the writer thread drain the queue, then close the journal"""
+    journal_queue.put(_STOP_WRITER)
+    journal_writer.join()
+    journal.close()
+
 
 class AuditLogger:
     """
@@ -25,8 +84,18 @@ class AuditLogger:
     
     Tracks all actions taken during forensic analysis to maintain
     a verifiable audit trail for legal compliance and chain of custody.
+    
+    The JSON Lines journal (audit_log_<case>.jsonl) is the authoritative
+    record: every entry is appended to it as it is logged. The JSON snapshot
+    (audit_log_<case>.json) is only rewritten by generate_audit_report() and
+    close(), so external readers should read the journal, or the snapshot
+    once the logger is closed.
     """
     
+    # Last whole second an entry was logged in and its formatted local time,
+    # replaced as one tuple so concurrent callers never mix two seconds
+    _last_second: Tuple[Optional[int], str] = (None, '')
+    
     def __init__(self, case_id: str, examiner: str, output_dir: str = "output/audit_logs"):
         """
         Initialize audit logger.
@@ -42,8 +111,14 @@ class AuditLogger:
         self.output_dir.mkdir(parents=True, exist_ok=True)
         
         self.audit_log_file = self.output_dir / f"audit_log_{case_id}.json"
+        self.audit_journal_file = self.output_dir / f"audit_log_{case_id}.jsonl"
         self.audit_entries: list = []
         
+        # Running tallies behind get_audit_summary
+        self._action_counts: Counter = Counter()
+        self._user_counts: Counter = Counter()
+        self._result_counts: Counter = Counter()
+        
         # Setup file handler for audit log
         self.file_handler = logging.FileHandler(
             self.output_dir / f"audit_{case_id}.log"
@@ -55,21 +130,100 @@ class AuditLogger:
         self.file_handler.setFormatter(formatter)
         
         # Load existing audit entries
+        journal_existed = self.audit_journal_file.exists()
         self._load_audit_log()
+        for entry in self.audit_entries:
+            self._count_entry(entry)
+        
+        # Entries are appended to the journal as they are logged
+        self._journal = open(self.audit_journal_file, 'ab')
+        if not journal_existed and self.audit_entries:
+            # Carry entries from a snapshot-only log over into the new journal
+            self._journal.writelines(dump_line(entry) for entry in self.audit_entries)
+            self._journal.flush()
+        
+        # Journal writes happen on a background thread; close() drains it
+        self._closed = False
+        self._journal_queue: queue.Queue = queue.Queue()
+        self._journal_writer = threading.Thread(
+            target=_write_journal, args=(self._journal_queue, self._journal),
+            name=f"audit-journal-{case_id}", daemon=True
+        )
+        self._journal_writer.start()
+        
+        # A logger dropped without close() still stops its writer once collected;
+        # loggers alive at exit are closed by _close_open_loggers instead
+        self._stop_writer = weakref.finalize(
+            self, _stop_journal_writer, self._journal_queue, self._journal_writer, self._journal
+        )
+        self._stop_writer.atexit = False
+        _OPEN_LOGGERS.add(self)
     
     def _load_audit_log(self):
-        """Load existing audit log entries"""
-        if self.audit_log_file.exists():
+        """
+        Load existing audit log entries.
+        
+        The append-only journal is authoritative; the JSON snapshot is only
+        read for logs written before the journal existed.
+        """
+        if self.audit_journal_file.exists():
             try:
-                with open(self.audit_log_file, 'r') as f:
-                    data = json.load(f)
+                with open(self.audit_journal_file, 'rb') as f:
+                    for line_number, line in enumerate(f, 1):
+                        if not line.strip():
+                            continue
+                        try:
+                            self.audit_entries.append(loads(line))
+                        except json.JSONDecodeError:
+                            logger.warning(f"Skipping unreadable audit journal line {line_number}")
+                logger.info(f"Loaded {len(self.audit_entries)} audit entries")
+            except Exception as e:
+                logger.warning(f"Could not load audit journal: {e}")
+        elif self.audit_log_file.exists():
+            try:
+                with open(self.audit_log_file, 'rb') as f:
+                    data = loads(f.read())
                     self.audit_entries = data.get('entries', [])
                 logger.info(f"Loaded {len(self.audit_entries)} audit entries")
             except Exception as e:
                 logger.warning(f"Could not load audit log: {e}")
     
+    def _timestamp(self) -> str:
+        """
+        Get the current local time in ISO 8601 format with microseconds.
+        
+        The date and time part is only reformatted when the second changes,
+        which keeps bursts of log entries cheap.
+        """
+        now = time.time()
+        second = int(now)
+        cached_second, second_text = self._last_second
+        if second != cached_second:
+            second_text = datetime.fromtimestamp(second).isoformat()
+            self._last_second = (second, second_text)
+        return f"{second_text}.{int((now - second) * 1_000_000):06d}"
+    
+    def _count_entry(self, entry: Dict[str, Any]):
+        """Add an entry to the summary tallies"""
+        self._action_counts[entry['action']] += 1
+        self._user_counts[entry['user']] += 1
+        self._result_counts[entry.get('result', 'unknown')] += 1
+    
+    def flush(self, sync: bool = False):
+        """
+        Block until every logged entry has been written to the journal.
+        
+        The JSON snapshot is not refreshed; the journal is the authoritative record.
+        
+        Args:
+            sync: Also fsync the journal so the entries survive a crash or power loss
+        """
+        self._journal_queue.join()
+        if sync and not self._journal.closed:
+            os.fsync(self._journal.fileno())
+    
     def _save_audit_log(self):
-        """Save audit log to file"""
+        """Save a snapshot of the full audit log to file (the journal stays authoritative)"""
         data = {
             'case_id': self.case_id,
             'examiner': self.examiner,
@@ -77,8 +231,8 @@ class AuditLogger:
             'entries': self.audit_entries
         }
         
-        with open(self.audit_log_file, 'w') as f:
-            json.dump(data, f, indent=2)
+        with open(self.audit_log_file, 'wb') as f:
+            f.write(dump_document(data))
     
     def log_action(
         self,
@@ -97,9 +251,12 @@ class AuditLogger:
             user: User performing the action
             resource: Resource affected by the action
             result: Result of the action (success, failure, etc.)
+            
+        Raises:
+            ValueError: If the logger has been closed
         """
         entry = {
-            'timestamp': datetime.now().isoformat(),
+            'timestamp': self._timestamp(),
             'action': action,
             'user': user or self.examiner,
             'resource': resource,
@@ -107,18 +264,26 @@ class AuditLogger:
             'details': details or {}
         }
         
+        if self._closed:
+            raise ValueError("Audit log is closed")
+        
         self.audit_entries.append(entry)
-        self._save_audit_log()
+        self._count_entry(entry)
+        # Serialize now so later changes to details cannot alter the record
+        self._journal_queue.put(dump_line(entry))
         
-        # Also log to file handler
-        log_message = f"{action} | User: {entry['user']} | Resource: {resource or 'N/A'}"
-        if result:
-            log_message += f" | Result: {result}"
-        logger.info(log_message)
+        # Also log to file handler; arguments are only formatted if a handler
+        # will actually emit the record
+        if logger.isEnabledFor(logging.INFO):
+            if result:
+                logger.info("%s | User: %s | Resource: %s | Result: %s",
+                            action, entry['user'], resource or 'N/A', result)
+            else:
+                logger.info("%s | User: %s | Resource: %s", action, entry['user'], resource or 'N/A')
         
         # Log details if provided
-        if details:
-            logger.debug(f"Action details: {details}")
+        if details and logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Action details: %s", details)
     
     def log_acquisition(
         self,
@@ -268,6 +433,19 @@ class AuditLogger:
             result='verified' if verified else 'failed'
         )
     
+    def close(self):
+        """Drain the journal writer, write a final snapshot and close the journal"""
+        if self._closed:
+            return
+        self._closed = True
+        self._stop_writer()
+        try:
+            self._save_audit_log()
+        except OSError as e:
+            logger.warning(f"Could not write audit log snapshot: {e}")
+        self.file_handler.close()
+        _OPEN_LOGGERS.discard(self)
+    
     def get_audit_summary(self) -> Dict:
         """
         Get summary of audit log entries.
@@ -275,24 +453,12 @@ class AuditLogger:
         Returns:
             Dictionary with audit summary statistics
         """
-        summary = {
+        return {
             'total_entries': len(self.audit_entries),
-            'actions': {},
-            'users': {},
-            'results': {}
+            'actions': dict(self._action_counts),
+            'users': dict(self._user_counts),
+            'results': dict(self._result_counts)
         }
-        
-        for entry in self.audit_entries:
-            action = entry['action']
-            summary['actions'][action] = summary['actions'].get(action, 0) + 1
-            
-            user = entry['user']
-            summary['users'][user] = summary['users'].get(user, 0) + 1
-            
-            result = entry.get('result', 'unknown')
-            summary['results'][result] = summary['results'].get(result, 0) + 1
-        
-        return summary
     
     def generate_audit_report(self, output_file: Optional[str] = None) -> str:
         """
@@ -310,18 +476,19 @@ class AuditLogger:
             output_file = Path(output_file)
             output_file.parent.mkdir(parents=True, exist_ok=True)
         
+        self._save_audit_log()
+        
         summary = self.get_audit_summary()
-        html_content = self._generate_html_report(summary)
         
-        with open(output_file, 'w', encoding='utf-8') as f:
-            f.write(html_content)
+        with open(output_file, 'w', encoding='utf-8', buffering=1 << 20) as f:
+            self._write_html_report(summary, f)
         
         logger.info(f"Generated audit report: {output_file}")
         return str(output_file)
     
-    def _generate_html_report(self, summary: Dict) -> str:
-        """Generate HTML audit report"""
-        html = f"""<!DOCTYPE html>
+    def _write_html_report(self, summary: Dict, fp: TextIO):
+        """Write HTML audit report to an open file, one row at a time"""
+        fp.write(f"""<!DOCTYPE html>
 <html lang="en">
 <head>
     <meta charset="utf-8">
@@ -370,15 +537,14 @@ class AuditLogger:
             <th>Action</th>
             <th>Count</th>
         </tr>
-"""
-        for action, count in summary['actions'].items():
-            html += f"""
+""")
+        fp.writelines(f"""
         <tr>
             <td>{action}</td>
             <td>{count}</td>
         </tr>
-"""
-        html += """
+""" for action, count in summary['actions'].items())
+        fp.write("""
     </table>
     
     <h2>Audit Trail</h2>
@@ -390,9 +556,8 @@ class AuditLogger:
             <th>Resource</th>
             <th>Result</th>
         </tr>
-"""
-        for entry in self.audit_entries:
-            html += f"""
+""")
+        fp.writelines(f"""
         <tr>
             <td>{entry['timestamp']}</td>
             <td>{entry['action']}</td>
@@ -400,10 +565,9 @@ class AuditLogger:
             <td>{entry.get('resource', 'N/A')}</td>
             <td>{entry.get('result', 'N/A')}</td>
         </tr>
-"""
-        html += """
+""" for entry in self.audit_entries)
+        fp.write("""
     </table>
 </body>
 </html>
-"""
-        return html
+""")
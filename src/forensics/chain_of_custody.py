@@ -9,16 +9,29 @@ Implements ACPO principles and maintains verifiable audit trail.
 """
 
 import json
-import hashlib
+import os
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from dataclasses import dataclass, asdict
-from typing import List, Dict, Optional
+from dataclasses import dataclass
+from hmac import compare_digest
+from html import escape
+from typing import BinaryIO, Iterable, Iterator, List, Dict, Optional, Tuple
 import logging
 
+from .hash_verification import HashVerifier
+from .serialization import dump_document, dump_line, loads
+
 logger = logging.getLogger(__name__)
 
 
+def _digest_equal(calculated: Optional[str], stored: Optional[str]) -> bool:
+    """Constant-time comparison of hex digests; two missing digests are equal."""
+    if calculated is None or stored is None:
+        return calculated is stored
+    return compare_digest(calculated.encode(), stored.lower().encode())
+
+
 @dataclass
 class EvidenceItem:
     """Represents a piece of evidence with chain of custody"""
@@ -35,10 +48,24 @@ class EvidenceItem:
     source_device: Optional[str] = None
     acquisition_method: Optional[str] = None
     custody_chain: List[Dict] = None
+    hash_blake3: Optional[str] = None
+    stat_snapshot: Optional[Dict[str, int]] = None  # file identity when hashed
     
     def __post_init__(self):
         if self.custody_chain is None:
             self.custody_chain = []
+    
+    def to_dict(self) -> Dict:
+        """
+        Get the item's fields as a dictionary for serialization.
+        
+        All fields are JSON scalars or the list of flat custody entry dicts,
+        so copying that list and its entries is enough and avoids asdict's
+        recursive deep copy. Editing the result never changes the item.
+        """
+        data = dict(self.__dict__)
+        data['custody_chain'] = [dict(entry) for entry in self.custody_chain]
+        return data
 
 
 class ChainOfCustody:
@@ -50,9 +77,21 @@ class ChainOfCustody:
     - When it was handled
     - What actions were performed
     - Integrity verification (hashes)
+    
+    The JSON Lines journal (chain_of_custody_<case>.jsonl) is the
+    authoritative record: every new item and custody entry is appended to it
+    immediately. The JSON snapshot (chain_of_custody_<case>.json) is only
+    rewritten by generate_custody_report(), so it can lag behind the journal.
     """
     
-    def __init__(self, case_id: str, examiner: str, output_dir: str = "output/chain_of_custody"):
+    def __init__(
+        self,
+        case_id: str,
+        examiner: str,
+        output_dir: str = "output/chain_of_custody",
+        compute_blake3: bool = False,
+        compute_md5: bool = True
+    ):
         """
         Initialize chain of custody tracker.
         
@@ -60,24 +99,59 @@ class ChainOfCustody:
             case_id: Unique case identifier
             examiner: Name of primary examiner
             output_dir: Directory for custody documentation
+            compute_blake3: Also record a BLAKE3 hash of new evidence (requires blake3)
+            compute_md5: Record an MD5 hash of new evidence alongside SHA256; when
+                False hash_md5 is left empty and only SHA256 is computed
         """
         self.case_id = case_id
         self.examiner = examiner
+        self.compute_blake3 = compute_blake3
+        self.compute_md5 = compute_md5
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(parents=True, exist_ok=True)
         
         self.evidence_items: Dict[str, EvidenceItem] = {}
+        # Stat snapshot of each item as of its last successful re-hash
+        self._verified_stats: Dict[str, Dict[str, int]] = {}
+        # Bumped on every change to the chain, so unchanged reports are not re-rendered
+        self._revision = 0
+        self._report_revisions: Dict[Path, int] = {}
         self.chain_log_file = self.output_dir / f"chain_of_custody_{case_id}.json"
+        self.chain_journal_file = self.output_dir / f"chain_of_custody_{case_id}.jsonl"
         
         # Load existing chain if it exists
+        journal_existed = self.chain_journal_file.exists()
         self._load_chain()
+        if not journal_existed and self.evidence_items:
+            # Carry items from a snapshot-only chain over into the new journal
+            self._append_records(
+                {'record': 'evidence', 'item': item.to_dict()} for item in self.evidence_items.values()
+            )
     
     def _load_chain(self):
-        """Load existing chain of custody from file"""
-        if self.chain_log_file.exists():
+        """
+        Load existing chain of custody from file.
+        
+        The append-only journal is authoritative and is replayed in order; the
+        JSON snapshot is only read for chains written before the journal existed.
+        """
+        if self.chain_journal_file.exists():
+            try:
+                with open(self.chain_journal_file, 'rb') as f:
+                    for line_number, line in enumerate(f, 1):
+                        if not line.strip():
+                            continue
+                        try:
+                            self._replay_record(loads(line))
+                        except (json.JSONDecodeError, KeyError, TypeError) as e:
+                            logger.warning(f"Skipping unreadable custody journal line {line_number}: {e}")
+                logger.info(f"Loaded {len(self.evidence_items)} evidence items from chain of custody")
+            except Exception as e:
+                logger.warning(f"Could not load chain of custody journal: {e}")
+        elif self.chain_log_file.exists():
             try:
-                with open(self.chain_log_file, 'r') as f:
-                    data = json.load(f)
+                with open(self.chain_log_file, 'rb') as f:
+                    data = loads(f.read())
                     for item_data in data.get('evidence_items', []):
                         item = EvidenceItem(**item_data)
                         self.evidence_items[item.item_id] = item
@@ -85,41 +159,124 @@ class ChainOfCustody:
             except Exception as e:
                 logger.warning(f"Could not load chain of custody: {e}")
     
+    def _replay_record(self, record: Dict):
+        """Apply one custody journal record to the in-memory chain"""
+        if record['record'] == 'evidence':
+            item = EvidenceItem(**record['item'])
+            self.evidence_items[item.item_id] = item
+        elif record['record'] == 'custody':
+            self.evidence_items[record['item_id']].custody_chain.append(record['entry'])
+    
+    def _append_records(self, records: Iterable[Dict]):
+        """
+        Append records to the custody journal.
+        
+        The journal is opened in append mode for each call, so every write
+        lands at the current end of file.
+        
+        Args:
+            records: Journal records to append
+        """
+        with open(self.chain_journal_file, 'ab') as f:
+            f.writelines(dump_line(record) for record in records)
+    
     def _save_chain(self):
-        """Save chain of custody to file"""
+        """Save a snapshot of the full chain of custody to file (the journal stays authoritative)"""
         data = {
             'case_id': self.case_id,
             'examiner': self.examiner,
             'created_at': datetime.now().isoformat(),
-            'evidence_items': [asdict(item) for item in self.evidence_items.values()]
+            'evidence_items': [item.to_dict() for item in self.evidence_items.values()]
         }
         
-        with open(self.chain_log_file, 'w') as f:
-            json.dump(data, f, indent=2)
+        with open(self.chain_log_file, 'wb') as f:
+            f.write(dump_document(data))
     
-    def _calculate_hashes(self, filepath: str) -> tuple:
+    def _calculate_hashes(
+        self,
+        filepath: str,
+        include_blake3: bool = False,
+        fileobj: Optional[BinaryIO] = None,
+        include_md5: bool = True
+    ) -> Dict[str, str]:
         """
         Calculate MD5 and SHA256 hashes of file.
         
         Args:
             filepath: Path to file
+            include_blake3: Whether to also calculate a BLAKE3 hash
+            fileobj: The file already opened in binary mode, to hash instead of reopening it
+            include_md5: Whether to calculate the MD5 hash; when False 'md5' is empty
             
         Returns:
-            Tuple of (MD5 hash, SHA256 hash)
+            Dictionary with 'md5', 'sha256' and, if requested, 'blake3' hashes
+        """
+        algorithms = ('md5', 'sha256') if include_md5 else ('sha256',)
+        if fileobj is not None:
+            hashes = HashVerifier.calculate_hashes_from_file(fileobj, algorithms)
+        else:
+            hashes = HashVerifier.calculate_hashes(filepath, algorithms)
+        hashes.setdefault('md5', '')
+        if include_blake3:
+            hashes['blake3'] = HashVerifier.calculate_blake3(filepath)
+        return hashes
+    
+    @staticmethod
+    def _stat_snapshot(stat: os.stat_result) -> Dict[str, int]:
         """
-        md5_hash = hashlib.md5()
-        sha256_hash = hashlib.sha256()
+        Capture the identity and change stamps of a file.
         
-        with open(filepath, 'rb') as f:
-            while chunk := f.read(8192):
-                md5_hash.update(chunk)
-                sha256_hash.update(chunk)
+        ctime is included because, unlike mtime, it cannot be set back with
+        utime, so any write or metadata change to the file alters the snapshot.
         
-        return md5_hash.hexdigest(), sha256_hash.hexdigest()
+        Args:
+            stat: Result of stat or fstat on the file
+            
+        Returns:
+            Dictionary with size, mtime_ns, ctime_ns, inode and device
+        """
+        return {
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'ctime_ns': stat.st_ctime_ns,
+            'inode': stat.st_ino,
+            'device': stat.st_dev,
+        }
     
-    def add_evidence(
+    def _hash_evidence(self, filepath: str) -> Tuple[Path, Dict[str, int], Dict[str, str]]:
+        """
+        Snapshot and hash an evidence file before it is recorded.
+        
+        The file is opened once and the snapshot taken with fstat on that
+        handle, so no separate exists/stat lookups hit the (often networked)
+        evidence share.
+        
+        Args:
+            filepath: Path to evidence file
+            
+        Returns:
+            Tuple of (path, stat snapshot, hashes)
+        """
+        try:
+            f = open(filepath, 'rb', buffering=0)
+        except FileNotFoundError:
+            raise FileNotFoundError(f"Evidence file not found: {filepath}") from None
+        
+        with f:
+            # Snapshot before hashing so a change made while hashing shows up as a mismatch
+            stat_snapshot = self._stat_snapshot(os.fstat(f.fileno()))
+            
+            # Calculate file hashes
+            hashes = self._calculate_hashes(
+                filepath, include_blake3=self.compute_blake3, fileobj=f, include_md5=self.compute_md5
+            )
+        return Path(filepath), stat_snapshot, hashes
+    
+    def _record_evidence(
         self,
-        filepath: str,
+        file_path: Path,
+        stat_snapshot: Dict[str, int],
+        hashes: Dict[str, str],
         description: str,
         evidence_type: str,
         source_device: Optional[str] = None,
@@ -127,30 +284,16 @@ class ChainOfCustody:
         acquired_by: Optional[str] = None
     ) -> EvidenceItem:
         """
-        Add evidence item to chain of custody.
+        Create an evidence item from its hashes and add it to the in-memory chain.
+        
+        The caller is responsible for appending the item to the journal.
         
-        Args:
-            filepath: Path to evidence file
-            description: Description of evidence
-            evidence_type: Type of evidence (database, key, media, etc.)
-            source_device: Source device identifier
-            acquisition_method: Method used to acquire evidence
-            acquired_by: Name of person who acquired evidence
-            
         Returns:
             EvidenceItem object
         """
-        file_path = Path(filepath)
-        if not file_path.exists():
-            raise FileNotFoundError(f"Evidence file not found: {filepath}")
-        
         # Generate unique evidence ID
         item_id = f"{self.case_id}_{evidence_type}_{len(self.evidence_items) + 1:04d}"
         
-        # Calculate file hashes
-        md5_hash, sha256_hash = self._calculate_hashes(filepath)
-        file_size = file_path.stat().st_size
-        
         # Create evidence item
         evidence = EvidenceItem(
             item_id=item_id,
@@ -159,12 +302,14 @@ class ChainOfCustody:
             description=description,
             acquired_at=datetime.now().isoformat(),
             acquired_by=acquired_by or self.examiner,
-            hash_md5=md5_hash,
-            hash_sha256=sha256_hash,
-            size_bytes=file_size,
+            hash_md5=hashes['md5'],
+            hash_sha256=hashes['sha256'],
+            size_bytes=stat_snapshot['size'],
             evidence_type=evidence_type,
             source_device=source_device,
-            acquisition_method=acquisition_method
+            acquisition_method=acquisition_method,
+            hash_blake3=hashes.get('blake3'),
+            stat_snapshot=stat_snapshot
         )
         
         # Add initial custody entry
@@ -176,20 +321,89 @@ class ChainOfCustody:
         })
         
         self.evidence_items[item_id] = evidence
-        self._save_chain()
-        
+        self._revision += 1
         logger.info(f"Added evidence to chain of custody: {item_id} - {description}")
         return evidence
     
-    def verify_integrity(self, item_id: str) -> bool:
+    def add_evidence(
+        self,
+        filepath: str,
+        description: str,
+        evidence_type: str,
+        source_device: Optional[str] = None,
+        acquisition_method: Optional[str] = None,
+        acquired_by: Optional[str] = None
+    ) -> EvidenceItem:
+        """
+        Add evidence item to chain of custody.
+        
+        Args:
+            filepath: Path to evidence file
+            description: Description of evidence
+            evidence_type: Type of evidence (database, key, media, etc.)
+            source_device: Source device identifier
+            acquisition_method: Method used to acquire evidence
+            acquired_by: Name of person who acquired evidence
+            
+        Returns:
+            EvidenceItem object
+        """
+        file_path, stat_snapshot, hashes = self._hash_evidence(filepath)
+        evidence = self._record_evidence(
+            file_path, stat_snapshot, hashes, description, evidence_type,
+            source_device, acquisition_method, acquired_by
+        )
+        self._append_records([{'record': 'evidence', 'item': evidence.to_dict()}])
+        return evidence
+    
+    def add_evidence_batch(self, items: List[Dict], max_workers: Optional[int] = None) -> List[EvidenceItem]:
         """
-        Verify integrity of evidence item by recalculating hashes.
+        Add many evidence items, hashing the files concurrently.
+        
+        hashlib releases the GIL while hashing, so many small files (keys,
+        exports, JSON artifacts) are hashed in parallel. Items are recorded
+        in the given order, so evidence IDs match sequential add_evidence calls,
+        and the journal is appended once for the whole batch.
+        
+        Args:
+            items: Dictionaries of add_evidence keyword arguments; each needs
+                'filepath', 'description' and 'evidence_type'
+            max_workers: Number of hashing threads (default: CPU count)
+            
+        Returns:
+            List of EvidenceItem objects, in the order given
+        """
+        items = list(items)
+        if not items:
+            return []
+        
+        workers = min(len(items), max_workers or os.cpu_count() or 1)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            prepared = list(executor.map(self._hash_evidence, (item['filepath'] for item in items)))
+        
+        # Nothing is recorded until every file has been hashed, so a missing
+        # file fails the whole batch
+        added = []
+        for item, (file_path, stat_snapshot, hashes) in zip(items, prepared):
+            details = {key: value for key, value in item.items() if key != 'filepath'}
+            added.append(self._record_evidence(file_path, stat_snapshot, hashes, **details))
+        
+        self._append_records({'record': 'evidence', 'item': evidence.to_dict()} for evidence in added)
+        return added
+    
+    def _check_integrity(self, item_id: str, trust_unchanged_stat: bool) -> Tuple[bool, Optional[Dict]]:
+        """
+        Check an evidence item's integrity without changing any shared state.
+        
+        Safe to run on worker threads; the caller records the returned stat
+        snapshot so later trusted checks can skip the file.
         
         Args:
             item_id: Evidence item ID
+            trust_unchanged_stat: See verify_integrity
             
         Returns:
-            True if hashes match, False otherwise
+            Tuple of (hashes match, stat snapshot to remember or None)
         """
         if item_id not in self.evidence_items:
             raise ValueError(f"Evidence item not found: {item_id}")
@@ -199,18 +413,94 @@ class ChainOfCustody:
         
         if not file_path.exists():
             logger.error(f"Evidence file no longer exists: {evidence.filepath}")
-            return False
+            return False, None
+        
+        stat_snapshot = self._stat_snapshot(file_path.stat())
+        if trust_unchanged_stat and stat_snapshot in (evidence.stat_snapshot, self._verified_stats.get(item_id)):
+            logger.info(f"Integrity verified for {item_id} (file unchanged since hashing)")
+            return True, None
         
         # Recalculate hashes
-        current_md5, current_sha256 = self._calculate_hashes(evidence.filepath)
+        # Items recorded without MD5 are verified on SHA256 (and BLAKE3) alone
+        try:
+            current = self._calculate_hashes(
+                evidence.filepath,
+                include_blake3=evidence.hash_blake3 is not None,
+                include_md5=bool(evidence.hash_md5)
+            )
+        except ImportError as e:
+            # A recorded BLAKE3 hash cannot be checked without the blake3 package
+            logger.error(f"Integrity of {item_id} cannot be verified: {e}")
+            return False, None
         
         # Compare with stored hashes
-        if current_md5 != evidence.hash_md5 or current_sha256 != evidence.hash_sha256:
+        if not (_digest_equal(current['md5'], evidence.hash_md5)
+                and _digest_equal(current['sha256'], evidence.hash_sha256)
+                and _digest_equal(current.get('blake3'), evidence.hash_blake3)):
             logger.error(f"Integrity check failed for {item_id}: hashes do not match")
-            return False
+            return False, None
         
         logger.info(f"Integrity verified for {item_id}")
-        return True
+        # Taken before re-hashing, so a change made meanwhile is not trusted later
+        return True, stat_snapshot
+    
+    def verify_integrity(self, item_id: str, trust_unchanged_stat: bool = False) -> bool:
+        """
+        Verify integrity of evidence item by recalculating hashes.
+        
+        An item with a recorded BLAKE3 hash is reported as not verified when
+        the blake3 package is unavailable.
+        
+        Args:
+            item_id: Evidence item ID
+            trust_unchanged_stat: Skip re-hashing when the file's size, inode and
+                modification/change times are exactly as recorded when it was hashed,
+                or when it was last verified by re-hashing
+            
+        Returns:
+            True if hashes match, False otherwise
+        """
+        verified, stat_snapshot = self._check_integrity(item_id, trust_unchanged_stat)
+        if stat_snapshot is not None:
+            self._verified_stats[item_id] = stat_snapshot
+        return verified
+    
+    def verify_all_integrity(
+        self,
+        trust_unchanged_stat: bool = False,
+        max_workers: Optional[int] = None
+    ) -> Dict[str, bool]:
+        """
+        Verify integrity of every evidence item, re-hashing files concurrently.
+        
+        Every item is checked rather than stopping at the first mismatch, so
+        the result names all items that failed. Worker threads only hash and
+        compare; what they found is recorded on the calling thread.
+        
+        Args:
+            trust_unchanged_stat: Passed through to verify_integrity
+            max_workers: Number of hashing threads (default: CPU count)
+            
+        Returns:
+            Dictionary mapping item ID to verification result, in evidence order
+        """
+        item_ids = list(self.evidence_items)
+        if not item_ids:
+            return {}
+        
+        workers = min(len(item_ids), max_workers or os.cpu_count() or 1)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            checks = list(executor.map(
+                lambda item_id: self._check_integrity(item_id, trust_unchanged_stat),
+                item_ids
+            ))
+        
+        results = {}
+        for item_id, (verified, stat_snapshot) in zip(item_ids, checks):
+            if stat_snapshot is not None:
+                self._verified_stats[item_id] = stat_snapshot
+            results[item_id] = verified
+        return results
     
     def add_custody_entry(
         self,
@@ -239,7 +529,8 @@ class ChainOfCustody:
         }
         
         self.evidence_items[item_id].custody_chain.append(entry)
-        self._save_chain()
+        self._revision += 1
+        self._append_records([{'record': 'custody', 'item_id': item_id, 'entry': entry}])
         
         logger.info(f"Added custody entry for {item_id}: {action} by {handler}")
     
@@ -247,6 +538,9 @@ class ChainOfCustody:
         """
         Generate chain of custody report.
         
+        A report already written to the same path since the last change to
+        the chain is reused rather than rendered again.
+        
         Args:
             output_file: Optional output file path
             
@@ -259,21 +553,26 @@ class ChainOfCustody:
             output_file = Path(output_file)
             output_file.parent.mkdir(parents=True, exist_ok=True)
         
-        html_content = self._generate_html_report()
+        if self._report_revisions.get(output_file) == self._revision and output_file.exists():
+            logger.debug(f"Chain of custody unchanged, reusing report: {output_file}")
+            return str(output_file)
+        
+        self._save_chain()
         
-        with open(output_file, 'w', encoding='utf-8') as f:
-            f.write(html_content)
+        with open(output_file, 'w', encoding='utf-8', buffering=1 << 20) as f:
+            f.writelines(self._iter_html_report())
+        self._report_revisions[output_file] = self._revision
         
         logger.info(f"Generated chain of custody report: {output_file}")
         return str(output_file)
     
-    def _generate_html_report(self) -> str:
-        """Generate HTML chain of custody report"""
-        html = f"""<!DOCTYPE html>
+    def _iter_html_report(self) -> Iterator[str]:
+        """Generate HTML chain of custody report piece by piece, escaping all recorded values"""
+        yield f"""<!DOCTYPE html>
 <html lang="en">
 <head>
     <meta charset="utf-8">
-    <title>Chain of Custody Report - {self.case_id}</title>
+    <title>Chain of Custody Report - {escape(self.case_id)}</title>
     <style>
         body {{ font-family: Arial, sans-serif; margin: 20px; }}
         table {{ border-collapse: collapse; width: 100%; margin: 20px 0; }}
@@ -286,8 +585,8 @@ class ChainOfCustody:
 <body>
     <div class="header">
         <h1>Chain of Custody Report</h1>
-        <p><strong>Case ID:</strong> {self.case_id}</p>
-        <p><strong>Primary Examiner:</strong> {self.examiner}</p>
+        <p><strong>Case ID:</strong> {escape(self.case_id)}</p>
+        <p><strong>Primary Examiner:</strong> {escape(self.examiner)}</p>
         <p><strong>Report Generated:</strong> {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</p>
     </div>
     
@@ -307,29 +606,29 @@ class ChainOfCustody:
 """
         
         for evidence in self.evidence_items.values():
-            html += f"""
+            yield f"""
         <tr>
-            <td>{evidence.item_id}</td>
-            <td>{evidence.filename}</td>
-            <td>{evidence.description}</td>
-            <td>{evidence.evidence_type}</td>
+            <td>{escape(evidence.item_id)}</td>
+            <td>{escape(evidence.filename)}</td>
+            <td>{escape(evidence.description)}</td>
+            <td>{escape(evidence.evidence_type)}</td>
             <td>{evidence.size_bytes:,}</td>
             <td><code>{evidence.hash_md5}</code></td>
             <td><code>{evidence.hash_sha256}</code></td>
-            <td>{evidence.acquired_at}</td>
-            <td>{evidence.acquired_by}</td>
+            <td>{escape(evidence.acquired_at)}</td>
+            <td>{escape(evidence.acquired_by)}</td>
         </tr>
 """
         
-        html += """
+        yield """
     </table>
     
     <h2>Custody Chain Details</h2>
 """
         
         for evidence in self.evidence_items.values():
-            html += f"""
-    <h3>{evidence.item_id}: {evidence.filename}</h3>
+            yield f"""
+    <h3>{escape(evidence.item_id)}: {escape(evidence.filename)}</h3>
     <table>
         <tr>
             <th>Timestamp</th>
@@ -339,20 +638,19 @@ class ChainOfCustody:
         </tr>
 """
             for entry in evidence.custody_chain:
-                html += f"""
+                yield f"""
         <tr>
-            <td>{entry['timestamp']}</td>
-            <td>{entry['action']}</td>
-            <td>{entry['handler']}</td>
-            <td>{entry.get('notes', '')}</td>
+            <td>{escape(entry['timestamp'])}</td>
+            <td>{escape(entry['action'])}</td>
+            <td>{escape(entry['handler'])}</td>
+            <td>{escape(entry.get('notes', ''))}</td>
         </tr>
 """
-            html += """
+            yield """
     </table>
 """
         
-        html += """
+        yield """
 </body>
 </html>
 """
-        return html
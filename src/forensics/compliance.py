@@ -11,6 +11,7 @@ Ensures forensic investigations comply with legal requirements and best practice
 - Evidence handling standards
 """
 
+from collections import Counter
 from pathlib import Path
 from typing import List, Dict, Optional
 from datetime import datetime
@@ -47,6 +48,12 @@ class ComplianceChecker:
         self.case_id = case_id
         self.compliance_issues: List[Dict] = []
         self.compliance_warnings: List[Dict] = []
+        self._issue_severity: Counter = Counter()
+    
+    def _add_issue(self, issue: Dict):
+        """Record a compliance issue and count it by severity"""
+        self.compliance_issues.append(issue)
+        self._issue_severity[issue['severity']] += 1
     
     def check_acpo_principles(self, has_audit_trail: bool, original_preserved: bool) -> bool:
         """
@@ -63,7 +70,7 @@ class ComplianceChecker:
         
         # Principle 1: Original data must not be changed
         if not original_preserved:
-            self.compliance_issues.append({
+            self._add_issue({
                 'principle': 'ACPO Principle 1',
                 'issue': 'Original evidence may have been modified',
                 'severity': 'high',
@@ -73,7 +80,7 @@ class ComplianceChecker:
         
         # Principle 3: Audit trail must exist
         if not has_audit_trail:
-            self.compliance_issues.append({
+            self._add_issue({
                 'principle': 'ACPO Principle 3',
                 'issue': 'Incomplete or missing audit trail',
                 'severity': 'high',
@@ -158,7 +165,7 @@ class ComplianceChecker:
         compliant = True
         
         if not has_custody_log:
-            self.compliance_issues.append({
+            self._add_issue({
                 'requirement': 'Chain of Custody',
                 'issue': 'Chain of custody log missing',
                 'severity': 'high',
@@ -167,7 +174,7 @@ class ComplianceChecker:
             compliant = False
         
         if not all_transfers_documented:
-            self.compliance_issues.append({
+            self._add_issue({
                 'requirement': 'Chain of Custody',
                 'issue': 'Not all evidence transfers are documented',
                 'severity': 'medium',
@@ -198,7 +205,7 @@ class ComplianceChecker:
         compliant = True
         
         if not has_hash_verification:
-            self.compliance_issues.append({
+            self._add_issue({
                 'requirement': 'Hash Verification',
                 'issue': 'Hash verification not performed',
                 'severity': 'high',
@@ -207,7 +214,7 @@ class ComplianceChecker:
             compliant = False
         
         if not hashes_stored:
-            self.compliance_issues.append({
+            self._add_issue({
                 'requirement': 'Hash Storage',
                 'issue': 'Hash values not stored for evidence',
                 'severity': 'high',
@@ -229,7 +236,7 @@ class ComplianceChecker:
             'report_date': datetime.now().isoformat(),
             'total_issues': len(self.compliance_issues),
             'total_warnings': len(self.compliance_warnings),
-            'high_severity_issues': len([i for i in self.compliance_issues if i['severity'] == 'high']),
+            'high_severity_issues': self._issue_severity['high'],
             'compliance_issues': self.compliance_issues,
             'compliance_warnings': self.compliance_warnings,
             'overall_status': 'compliant' if len(self.compliance_issues) == 0 else 'non-compliant'
@@ -246,15 +253,15 @@ class ComplianceChecker:
         """
         issues_count = len(self.compliance_issues)
         warnings_count = len(self.compliance_warnings)
-        high_issues = len([i for i in self.compliance_issues if i['severity'] == 'high'])
+        high_issues = self._issue_severity['high']
         
         summary = f"""
 Compliance Summary for Case: {self.case_id}
 ===========================================
 Total Issues: {issues_count}
   - High Severity: {high_issues}
-  - Medium Severity: {len([i for i in self.compliance_issues if i['severity'] == 'medium'])}
-  - Low Severity: {len([i for i in self.compliance_issues if i['severity'] == 'low'])}
+  - Medium Severity: {self._issue_severity['medium']}
+  - Low Severity: {self._issue_severity['low']}
 Total Warnings: {warnings_count}
 
 Overall Status: {'COMPLIANT' if issues_count == 0 else 'NON-COMPLIANT'}
@@ -9,12 +9,34 @@ Ensures data integrity throughout the forensic process.
 """
 
 import hashlib
+import mmap
+import os
+from concurrent.futures import ThreadPoolExecutor
+from hmac import compare_digest
 from pathlib import Path
-from typing import Dict, Optional, Tuple
+from typing import BinaryIO, Dict, Optional, Tuple
 import logging
 
+# BLAKE3 is optional; it is only needed when explicitly requested
+try:
+    import blake3
+except ImportError:
+    blake3 = None
+
 logger = logging.getLogger(__name__)
 
+# Read size for hashing loops; large reads keep the time in OpenSSL's hash code
+HASH_CHUNK_SIZE = 1024 * 1024
+
+# Files at least this large are hashed from a memory map instead of a read loop
+MMAP_HASH_MIN_SIZE = 16 * 1024 * 1024
+
+# Files at least this large get one thread per hash algorithm on multi-core machines
+PARALLEL_HASH_MIN_SIZE = 64 * 1024 * 1024
+
+# Algorithms accepted by name in verification and comparison
+SUPPORTED_ALGORITHMS = frozenset({'md5', 'sha256', 'sha512'})
+
 
 class HashVerifier:
     """
@@ -25,7 +47,52 @@ class HashVerifier:
     """
     
     @staticmethod
-    def calculate_md5(filepath: str, chunk_size: int = 8192) -> str:
+    def _digest_file(filepath: str, algorithm: str, chunk_size: int) -> str:
+        """
+        Hash a file with a single algorithm.
+        
+        Uses hashlib.file_digest on Python 3.11+, which reads and hashes in C
+        without holding the GIL; older interpreters fall back to a loop reading
+        into one reused buffer.
+        
+        Args:
+            filepath: Path to file
+            algorithm: hashlib algorithm name
+            chunk_size: Size of chunks to read at a time in the fallback loop
+            
+        Returns:
+            Hash as hexadecimal string
+        """
+        with open(filepath, 'rb') as f:
+            if hasattr(hashlib, 'file_digest'):
+                return hashlib.file_digest(f, algorithm).hexdigest()
+            file_hash = hashlib.new(algorithm)
+            buffer = bytearray(chunk_size)
+            view = memoryview(buffer)
+            while n := f.readinto(buffer):
+                file_hash.update(view[:n])
+            return file_hash.hexdigest()
+    
+    @staticmethod
+    def calculate(filepath: str, algorithm: str, chunk_size: int = HASH_CHUNK_SIZE) -> str:
+        """
+        Calculate a hash of file by algorithm name.
+        
+        Args:
+            filepath: Path to file
+            algorithm: Hash algorithm to use (md5, sha256, sha512), case-insensitive
+            chunk_size: Size of chunks to read at a time
+            
+        Returns:
+            Hash as hexadecimal string
+        """
+        name = algorithm.lower()
+        if name not in SUPPORTED_ALGORITHMS:
+            raise ValueError(f"Unsupported algorithm: {algorithm}")
+        return HashVerifier._digest_file(filepath, name, chunk_size)
+    
+    @staticmethod
+    def calculate_md5(filepath: str, chunk_size: int = HASH_CHUNK_SIZE) -> str:
         """
         Calculate MD5 hash of file.
         
@@ -36,14 +103,10 @@ class HashVerifier:
         Returns:
             MD5 hash as hexadecimal string
         """
-        md5_hash = hashlib.md5()
-        with open(filepath, 'rb') as f:
-            while chunk := f.read(chunk_size):
-                md5_hash.update(chunk)
-        return md5_hash.hexdigest()
+        return HashVerifier._digest_file(filepath, 'md5', chunk_size)
     
     @staticmethod
-    def calculate_sha256(filepath: str, chunk_size: int = 8192) -> str:
+    def calculate_sha256(filepath: str, chunk_size: int = HASH_CHUNK_SIZE) -> str:
         """
         Calculate SHA256 hash of file.
         
@@ -54,14 +117,10 @@ class HashVerifier:
         Returns:
             SHA256 hash as hexadecimal string
         """
-        sha256_hash = hashlib.sha256()
-        with open(filepath, 'rb') as f:
-            while chunk := f.read(chunk_size):
-                sha256_hash.update(chunk)
-        return sha256_hash.hexdigest()
+        return HashVerifier._digest_file(filepath, 'sha256', chunk_size)
     
     @staticmethod
-    def calculate_sha512(filepath: str, chunk_size: int = 8192) -> str:
+    def calculate_sha512(filepath: str, chunk_size: int = HASH_CHUNK_SIZE) -> str:
         """
         Calculate SHA512 hash of file.
         
@@ -72,11 +131,26 @@ class HashVerifier:
         Returns:
             SHA512 hash as hexadecimal string
         """
-        sha512_hash = hashlib.sha512()
-        with open(filepath, 'rb') as f:
-            while chunk := f.read(chunk_size):
-                sha512_hash.update(chunk)
-        return sha512_hash.hexdigest()
+        return HashVerifier._digest_file(filepath, 'sha512', chunk_size)
+    
+    @staticmethod
+    def calculate_blake3(filepath: str) -> str:
+        """
+        Calculate BLAKE3 hash of file.
+        
+        Uses the blake3 package's memory-mapped, multithreaded SIMD tree hash.
+        
+        Args:
+            filepath: Path to file
+            
+        Returns:
+            BLAKE3 hash as hexadecimal string
+        """
+        if blake3 is None:
+            raise ImportError("blake3 is required for BLAKE3 hashing. Install with: pip install blake3")
+        blake3_hash = blake3.blake3(max_threads=blake3.blake3.AUTO)
+        blake3_hash.update_mmap(filepath)
+        return blake3_hash.hexdigest()
     
     @staticmethod
     def calculate_all(filepath: str) -> Dict[str, str]:
@@ -93,21 +167,115 @@ class HashVerifier:
         if not file_path.exists():
             raise FileNotFoundError(f"File not found: {filepath}")
         
-        md5_hash = hashlib.md5()
-        sha256_hash = hashlib.sha256()
-        sha512_hash = hashlib.sha512()
+        return HashVerifier.calculate_hashes(filepath, ('md5', 'sha256', 'sha512'))
+    
+    @staticmethod
+    def calculate_hashes(filepath: str, algorithms: Tuple[str, ...], chunk_size: int = HASH_CHUNK_SIZE) -> Dict[str, str]:
+        """
+        Calculate several hashes of a file in a single pass.
         
-        with open(filepath, 'rb') as f:
-            while chunk := f.read(8192):
-                md5_hash.update(chunk)
-                sha256_hash.update(chunk)
-                sha512_hash.update(chunk)
-        
-        return {
-            'md5': md5_hash.hexdigest(),
-            'sha256': sha256_hash.hexdigest(),
-            'sha512': sha512_hash.hexdigest()
-        }
+        The file is read into one reused buffer and every chunk is fed to
+        each hasher, so the file is read once however many hashes are needed.
+        Large files are instead memory-mapped and hashed straight from the
+        page cache; on multi-core machines the largest get one thread per
+        algorithm, since hashlib releases the GIL while hashing.
+        
+        Args:
+            filepath: Path to file
+            algorithms: hashlib algorithm names
+            chunk_size: Size of chunks to read at a time
+            
+        Returns:
+            Dictionary with hash algorithm names as keys and hashes as values
+        """
+        with open(filepath, 'rb', buffering=0) as f:
+            return HashVerifier.calculate_hashes_from_file(f, algorithms, chunk_size)
+    
+    @staticmethod
+    def calculate_hashes_from_file(f: BinaryIO, algorithms: Tuple[str, ...], chunk_size: int = HASH_CHUNK_SIZE) -> Dict[str, str]:
+        """
+        Calculate several hashes of an already open file in a single pass.
+        
+        Lets callers that also need the file's metadata fstat the same handle
+        instead of looking the path up again.
+        
+        Args:
+            f: File opened in binary mode, positioned at the start
+            algorithms: hashlib algorithm names
+            chunk_size: Size of chunks to read at a time
+            
+        Returns:
+            Dictionary with hash algorithm names as keys and hashes as values
+        """
+        size = os.fstat(f.fileno()).st_size
+        parallel = len(algorithms) > 1 and (os.cpu_count() or 1) > 1 and size >= PARALLEL_HASH_MIN_SIZE
+        if parallel or size >= MMAP_HASH_MIN_SIZE:
+            return HashVerifier._calculate_hashes_mapped(f, algorithms, chunk_size, parallel)
+        
+        if hasattr(os, 'posix_fadvise'):
+            # Let the kernel read ahead aggressively while we hash
+            try:
+                os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+            except OSError as e:
+                logger.debug(f"Readahead advice not applied: {e}")
+        
+        hashers = [hashlib.new(algorithm) for algorithm in algorithms]
+        buffer = bytearray(chunk_size)
+        view = memoryview(buffer)
+        
+        while n := f.readinto(buffer):
+            chunk = view[:n]
+            for hasher in hashers:
+                hasher.update(chunk)
+        
+        return {algorithm: hasher.hexdigest() for algorithm, hasher in zip(algorithms, hashers)}
+    
+    @staticmethod
+    def _calculate_hashes_mapped(
+        f: BinaryIO,
+        algorithms: Tuple[str, ...],
+        chunk_size: int,
+        parallel: bool = False
+    ) -> Dict[str, str]:
+        """
+        Calculate several hashes of a memory-mapped file.
+        
+        The hashers read straight from the mapped page cache, skipping the
+        copy into a read buffer. With parallel set, each algorithm is hashed
+        by its own thread; hashlib releases the GIL while hashing.
+        
+        Args:
+            f: File opened in binary mode; must not be empty
+            algorithms: hashlib algorithm names
+            chunk_size: Size of the slices fed to the hashers
+            parallel: Hash each algorithm on its own thread
+            
+        Returns:
+            Dictionary with hash algorithm names as keys and hashes as values
+        """
+        def digest(view: memoryview, algorithm: str) -> str:
+            hasher = hashlib.new(algorithm)
+            for offset in range(0, len(view), chunk_size):
+                with view[offset:offset + chunk_size] as chunk:
+                    hasher.update(chunk)
+            return hasher.hexdigest()
+        
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if hasattr(mmap, 'MADV_SEQUENTIAL'):
+                mm.madvise(mmap.MADV_SEQUENTIAL)
+            with memoryview(mm) as view:
+                if parallel:
+                    with ThreadPoolExecutor(max_workers=len(algorithms)) as executor:
+                        digests = list(executor.map(lambda algorithm: digest(view, algorithm), algorithms))
+                else:
+                    hashers = [hashlib.new(algorithm) for algorithm in algorithms]
+                    for offset in range(0, len(view), chunk_size):
+                        with view[offset:offset + chunk_size] as chunk:
+                            for hasher in hashers:
+                                hasher.update(chunk)
+                    digests = [hasher.hexdigest() for hasher in hashers]
+        
+        return dict(zip(algorithms, digests))
     
     @staticmethod
     def verify_hash(filepath: str, expected_hash: str, algorithm: str = 'sha256') -> bool:
@@ -127,16 +295,11 @@ class HashVerifier:
             logger.error(f"File not found: {filepath}")
             return False
         
-        if algorithm.lower() == 'md5':
-            calculated_hash = HashVerifier.calculate_md5(filepath)
-        elif algorithm.lower() == 'sha256':
-            calculated_hash = HashVerifier.calculate_sha256(filepath)
-        elif algorithm.lower() == 'sha512':
-            calculated_hash = HashVerifier.calculate_sha512(filepath)
-        else:
-            raise ValueError(f"Unsupported algorithm: {algorithm}")
+        expected = expected_hash.lower()
+        calculated_hash = HashVerifier.calculate(filepath, algorithm)
         
-        match = calculated_hash.lower() == expected_hash.lower()
+        # hexdigest() is already lowercase; compare in constant time
+        match = compare_digest(calculated_hash.encode(), expected.encode())
         
         if not match:
             logger.warning(
@@ -150,31 +313,32 @@ class HashVerifier:
         return match
     
     @staticmethod
-    def compare_files(file1: str, file2: str, algorithm: str = 'sha256') -> bool:
+    def compare_files(file1: str, file2: str, algorithm: str = 'sha256', by_hash: bool = False) -> bool:
         """
-        Compare two files using hash values.
+        Compare two files.
+        
+        Files of different sizes differ without reading either. Otherwise the
+        contents are compared chunk by chunk, stopping at the first difference,
+        unless by_hash asks for a comparison of hash values.
         
         Args:
             file1: Path to first file
             file2: Path to second file
             algorithm: Hash algorithm to use
+            by_hash: Compare full hashes instead of the bytes themselves
             
         Returns:
             True if files are identical, False otherwise
         """
-        if algorithm.lower() == 'md5':
-            hash1 = HashVerifier.calculate_md5(file1)
-            hash2 = HashVerifier.calculate_md5(file2)
-        elif algorithm.lower() == 'sha256':
-            hash1 = HashVerifier.calculate_sha256(file1)
-            hash2 = HashVerifier.calculate_sha256(file2)
-        elif algorithm.lower() == 'sha512':
-            hash1 = HashVerifier.calculate_sha512(file1)
-            hash2 = HashVerifier.calculate_sha512(file2)
-        else:
+        if algorithm.lower() not in SUPPORTED_ALGORITHMS:
             raise ValueError(f"Unsupported algorithm: {algorithm}")
         
-        match = hash1 == hash2
+        if os.path.getsize(file1) != os.path.getsize(file2):
+            match = False
+        elif not by_hash:
+            match = HashVerifier._same_contents(file1, file2)
+        else:
+            match = HashVerifier._same_hash(file1, file2, algorithm)
         
         if match:
             logger.info(f"Files are identical: {file1} == {file2}")
@@ -182,3 +346,26 @@ class HashVerifier:
             logger.warning(f"Files differ: {file1} != {file2}")
         
         return match
+    
+    @staticmethod
+    def _same_contents(file1: str, file2: str, chunk_size: int = HASH_CHUNK_SIZE) -> bool:
+        """Compare two files byte for byte, stopping at the first differing chunk"""
+        buffer1 = bytearray(chunk_size)
+        buffer2 = bytearray(chunk_size)
+        # Buffered readers fill the whole buffer unless they reach end of file
+        with open(file1, 'rb') as f1, open(file2, 'rb') as f2:
+            while True:
+                n1 = f1.readinto(buffer1)
+                n2 = f2.readinto(buffer2)
+                if n1 != n2:
+                    return False
+                if n1 < chunk_size:
+                    # Last chunk: bytearray comparison is a memcmp
+                    return buffer1[:n1] == buffer2[:n2]
+                if buffer1 != buffer2:
+                    return False
+    
+    @staticmethod
+    def _same_hash(file1: str, file2: str, algorithm: str) -> bool:
+        """Compare two files by hash value"""
+        return HashVerifier.calculate(file1, algorithm) == HashVerifier.calculate(file2, algorithm)
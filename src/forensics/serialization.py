@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Serialization Module
+
+JSON encoding shared by the forensic logs. Uses orjson when it is installed
+and the standard library otherwise; both produce UTF-8 bytes.
+"""
+
+import json
+from typing import Any
+
+try:
+    import orjson
+    
+    def dump_line(obj: Any) -> bytes:
+        """Encode an object as one newline-terminated JSON Lines record"""
+        return orjson.dumps(obj, option=orjson.OPT_APPEND_NEWLINE)
+    
+    def dump_document(obj: Any) -> bytes:
+        """Encode an object as an indented JSON document"""
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+    
+    loads = orjson.loads
+except ImportError:
+    def dump_line(obj: Any) -> bytes:
+        """Encode an object as one newline-terminated JSON Lines record"""
+        return (json.dumps(obj) + '\n').encode('utf-8')
+    
+    def dump_document(obj: Any) -> bytes:
+        """Encode an object as an indented JSON document"""
+        return json.dumps(obj, indent=2).encode('utf-8')
+    
+    loads = json.loads
@@ -12,6 +12,9 @@ import sys
 import os
 import json
 import shutil
+from concurrent.futures import ThreadPoolExecutor
+from functools import cached_property
+from hmac import compare_digest
 from pathlib import Path
 from typing import Optional, Dict, List
 from datetime import datetime
@@ -24,13 +27,26 @@ from src.forensics import (
     ComplianceChecker,
     SoftwareWriteBlocker,
 )
-from src.acquisition import WhatsAppAcquirer
-from src.crypto import WhatsAppDecryptor
 from src.parsing import WhatsAppParser
-from src.reporting import WhatsAppReporter
 
 logger = logging.getLogger(__name__)
 
+# Forensic report writers by format, called as (reporter, chats, contacts,
+# call_logs, metadata); each returns the path of the main report file. Looked
+# up on the reporter instance so the reporting module is still imported lazily.
+FORENSIC_REPORT_WRITERS = {
+    'html': lambda reporter, chats, contacts, call_logs, metadata: reporter.generate_html_report(
+        chats, contacts, call_logs, metadata
+    ),
+    'json': lambda reporter, chats, contacts, call_logs, metadata: reporter.generate_json_report(
+        chats, contacts, call_logs, metadata
+    ),
+    # CSV has no metadata section and writes one file per table; the first is the main report
+    'csv': lambda reporter, chats, contacts, call_logs, metadata: next(
+        iter(reporter.generate_csv_report(chats, contacts, call_logs)), None
+    ),
+}
+
 
 class ForensicToolkitIntegration:
     """
@@ -80,10 +96,6 @@ class ForensicToolkitIntegration:
         self.compliance_checker = ComplianceChecker(case_id)
         self.write_blocker = SoftwareWriteBlocker(enabled=enforce_write_blocker)
         
-        # Initialize toolkit components
-        self.acquirer = WhatsAppAcquirer(output_dir=str(self.acquisition_dir))
-        self.reporter = WhatsAppReporter(output_dir=str(self.reports_dir))
-        
         # Log initialization
         self.audit_logger.log_action(
             action='initialize',
@@ -93,6 +105,28 @@ class ForensicToolkitIntegration:
         
         logger.info(f"Initialized forensic toolkit for case: {case_id}")
 
+    def close(self):
+        """Close the audit log, writing its final snapshot; safe to call twice"""
+        self.audit_logger.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    @cached_property
+    def acquirer(self):
+        """Acquirer for this case, created (and its module imported) on first use"""
+        from src.acquisition import WhatsAppAcquirer
+        return WhatsAppAcquirer(output_dir=str(self.acquisition_dir))
+
+    @cached_property
+    def reporter(self):
+        """Reporter for this case, created (and reportlab imported) on first use"""
+        from src.reporting import WhatsAppReporter
+        return WhatsAppReporter(output_dir=str(self.reports_dir))
+
     def _register_artifact(
         self,
         file_path: Path,
@@ -200,29 +234,34 @@ class ForensicToolkitIntegration:
                 wa_db_path = candidate
                 break
 
-        parse_result = self.parse_with_compliance(msgstore_db=msgstore_path, wa_db=wa_db_path)
+        # Messages are loaded per chat below, so parsing only needs to count them
+        parse_result = self.parse_with_compliance(
+            msgstore_db=msgstore_path, wa_db=wa_db_path, include_messages=False
+        )
         if not parse_result.get("success"):
             return parse_result
 
         chats = parse_result["chats"]
         parser = WhatsAppParser(msgstore_path, wa_db_path)
+        messages_by_chat = parser.get_messages_batch([chat.jid for chat in chats], limit_per_chat=1000)
         for chat in chats:
-            chat.messages = parser.get_messages(chat.jid, limit=1000)
+            chat.messages = messages_by_chat.get(chat.jid, [])
 
         contacts = parse_result["contacts"]
         call_logs = parse_result["call_logs"]
 
         report_formats = [report_format] if report_format != "all" else ["html", "json", "csv", "pdf"]
+        view_model = self.reporter.prepare_view_model(chats, contacts, call_logs, metadata)
         generated_reports: List[str] = []
         for fmt in report_formats:
             if fmt == "html":
-                generated_reports.append(self.reporter.generate_html_report(chats, contacts, call_logs, metadata))
+                generated_reports.append(self.reporter.generate_html_report(chats, contacts, call_logs, view_model=view_model))
             elif fmt == "json":
-                generated_reports.append(self.reporter.generate_json_report(chats, contacts, call_logs, metadata))
+                generated_reports.append(self.reporter.generate_json_report(chats, contacts, call_logs, view_model=view_model))
             elif fmt == "csv":
-                generated_reports.extend(self.reporter.generate_csv_report(chats, contacts, call_logs))
+                generated_reports.extend(self.reporter.generate_csv_report(chats, contacts, call_logs, view_model=view_model))
             elif fmt == "pdf":
-                generated_reports.append(self.reporter.generate_pdf_report(chats, contacts, call_logs, metadata))
+                generated_reports.append(self.reporter.generate_pdf_report(chats, contacts, call_logs, view_model=view_model))
 
         artifact_entries = []
         for report in generated_reports:
@@ -238,7 +277,8 @@ class ForensicToolkitIntegration:
 
         custody_report = self.chain_of_custody.generate_custody_report()
         audit_report = self.audit_logger.generate_audit_report()
-        compliance = self.check_compliance()
+        # Everything was hashed during this workflow; only re-hash what has changed since
+        compliance = self.check_compliance(trust_unchanged_stat=True)
 
         case_manifest = {
             "case_id": self.case_id,
@@ -273,6 +313,8 @@ class ForensicToolkitIntegration:
         final_bundle_dir = self.output_dir / f"{self.case_id}_bundle"
         if final_bundle_dir.exists():
             shutil.rmtree(final_bundle_dir)
+        # The audit journal is written in the background; make it complete before copying
+        self.audit_logger.flush(sync=True)
         shutil.copytree(self.case_dir, final_bundle_dir)
 
         return {
@@ -327,29 +369,39 @@ class ForensicToolkitIntegration:
             else:
                 raise ValueError(f"Unsupported source: {source}")
             
-            # Add evidence items to chain of custody
-            evidence_items = []
-            for source_path, dest_path in acquired_files.items():
-                evidence = self.chain_of_custody.add_evidence(
+            # Add evidence items to chain of custody, hashing the files concurrently;
+            # these hashes are the reference later integrity checks re-hash against
+            evidence_items = self.chain_of_custody.add_evidence_batch([
+                {
+                    'filepath': dest_path,
+                    'description': f"WhatsApp database acquired from {source}",
+                    'evidence_type': "database",
+                    'source_device': device_id or input_path,
+                    'acquisition_method': method,
+                    'acquired_by': self.examiner
+                }
+                for dest_path in acquired_files.values()
+            ])
+            
+            # Verify each copy against the SHA-256 taken from the same read that
+            # copied it; files without one (ADB pulls) are re-hashed from disk.
+            # Audit entries are written from this thread, in acquisition order
+            recorded_hashes = self.acquirer.get_recorded_hashes(acquired_files)
+            integrity_verified = True
+            for dest_path, evidence in zip(acquired_files.values(), evidence_items):
+                recorded = recorded_hashes.get(dest_path)
+                if recorded is not None:
+                    integrity_ok = compare_digest(recorded.encode(), evidence.hash_sha256.encode())
+                else:
+                    integrity_ok = self.chain_of_custody.verify_integrity(evidence.item_id)
+                integrity_verified = integrity_verified and integrity_ok
+                self.audit_logger.log_hash_verification(
                     filepath=dest_path,
-                    description=f"WhatsApp database acquired from {source}",
-                    evidence_type="database",
-                    source_device=device_id or input_path,
-                    acquisition_method=method,
-                    acquired_by=self.examiner
+                    hash_algorithm='sha256',
+                    hash_value=evidence.hash_sha256,
+                    verified=integrity_ok,
+                    user=self.examiner
                 )
-                evidence_items.append(evidence)
-                
-                # Verify integrity immediately
-                integrity_ok = self.chain_of_custody.verify_integrity(evidence.item_id)
-                if integrity_ok:
-                    self.audit_logger.log_hash_verification(
-                        filepath=dest_path,
-                        hash_algorithm='sha256',
-                        hash_value=evidence.hash_sha256,
-                        verified=True,
-                        user=self.examiner
-                    )
             
             # Log acquisition
             self.audit_logger.log_acquisition(
@@ -363,7 +415,7 @@ class ForensicToolkitIntegration:
                 'success': True,
                 'files': acquired_files,
                 'evidence_items': [e.item_id for e in evidence_items],
-                'integrity_verified': True
+                'integrity_verified': integrity_verified
             }
             
         except Exception as e:
@@ -400,7 +452,6 @@ class ForensicToolkitIntegration:
         if not Path(encrypted_file).exists():
             raise FileNotFoundError(f"Encrypted file not found: {encrypted_file}")
         
-        enc_hashes = self.hash_verifier.calculate_all(encrypted_file)
         enc_evidence = self.chain_of_custody.add_evidence(
             filepath=encrypted_file,
             description="Encrypted WhatsApp database",
@@ -421,6 +472,7 @@ class ForensicToolkitIntegration:
         
         # Perform decryption
         try:
+            from src.crypto import WhatsAppDecryptor
             decryptor = WhatsAppDecryptor(key_file)
             decrypted_path = decryptor.decrypt(encrypted_file, output_file)
             
@@ -433,7 +485,7 @@ class ForensicToolkitIntegration:
                     acquired_by=self.examiner
                 )
                 
-                # Verify integrity
+                # Verify integrity by re-hashing the decrypted file
                 integrity_ok = self.chain_of_custody.verify_integrity(dec_evidence.item_id)
                 
                 # Log decryption
@@ -471,7 +523,8 @@ class ForensicToolkitIntegration:
     def parse_with_compliance(
         self,
         msgstore_db: str,
-        wa_db: Optional[str] = None
+        wa_db: Optional[str] = None,
+        include_messages: bool = True
     ) -> Dict:
         """
         Parse database with forensic compliance tracking.
@@ -479,6 +532,8 @@ class ForensicToolkitIntegration:
         Args:
             msgstore_db: Path to msgstore.db
             wa_db: Optional path to wa.db
+            include_messages: Return every message; when False messages are
+                only counted in SQLite, and 'messages' is None
             
         Returns:
             Dictionary with parsed data and compliance information
@@ -488,7 +543,12 @@ class ForensicToolkitIntegration:
             
             # Get all data
             chats = parser.get_chats()
-            messages = parser.get_messages()
+            if include_messages:
+                messages = parser.get_messages()
+                message_count = len(messages)
+            else:
+                messages = None
+                message_count = parser.count_messages()
             contacts = parser.get_contacts()
             call_logs = parser.get_call_logs()
             
@@ -496,7 +556,7 @@ class ForensicToolkitIntegration:
             self.audit_logger.log_parsing(
                 database_file=msgstore_db,
                 chats_found=len(chats),
-                messages_found=len(messages),
+                messages_found=message_count,
                 contacts_found=len(contacts),
                 user=self.examiner
             )
@@ -509,7 +569,7 @@ class ForensicToolkitIntegration:
                 'call_logs': call_logs,
                 'statistics': {
                     'total_chats': len(chats),
-                    'total_messages': len(messages),
+                    'total_messages': message_count,
                     'total_contacts': len(contacts),
                     'total_call_logs': len(call_logs)
                 }
@@ -544,21 +604,19 @@ class ForensicToolkitIntegration:
             Dictionary with report paths and compliance information
         """
         # Generate main report
-        if report_format == 'html':
-            report_file = self.reporter.generate_html_report(chats, contacts, call_logs, metadata)
-        elif report_format == 'json':
-            report_file = self.reporter.generate_json_report(chats, contacts, call_logs, metadata)
-        elif report_format == 'csv':
-            report_files = self.reporter.generate_csv_report(chats, contacts, call_logs)
-            report_file = report_files[0] if report_files else None
-        else:
-            raise ValueError(f"Unsupported format: {report_format}")
-        
-        # Generate chain of custody report
-        custody_report = self.chain_of_custody.generate_custody_report()
+        try:
+            write_report = FORENSIC_REPORT_WRITERS[report_format]
+        except KeyError:
+            raise ValueError(f"Unsupported format: {report_format}") from None
         
-        # Generate audit report
-        audit_report = self.audit_logger.generate_audit_report()
+        # The custody and audit reports only read their own state and write
+        # their own files, so render them alongside the main report
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            custody_future = executor.submit(self.chain_of_custody.generate_custody_report)
+            audit_future = executor.submit(self.audit_logger.generate_audit_report)
+            report_file = write_report(self.reporter, chats, contacts, call_logs, metadata)
+            custody_report = custody_future.result()
+            audit_report = audit_future.result()
         
         # Log report generation
         self.audit_logger.log_report_generation(
@@ -575,10 +633,14 @@ class ForensicToolkitIntegration:
             'audit_report': audit_report
         }
     
-    def check_compliance(self) -> Dict:
+    def check_compliance(self, trust_unchanged_stat: bool = False) -> Dict:
         """
         Check compliance with forensic standards.
         
+        Args:
+            trust_unchanged_stat: Don't re-hash evidence whose stat snapshot is
+                unchanged since it was hashed or last verified
+            
         Returns:
             Dictionary with compliance status and issues
         """
@@ -587,10 +649,8 @@ class ForensicToolkitIntegration:
         has_custody_log = len(self.chain_of_custody.evidence_items) > 0
         
         # Check hash verification
-        all_verified = all(
-            self.chain_of_custody.verify_integrity(item_id)
-            for item_id in self.chain_of_custody.evidence_items.keys()
-        )
+        verified = self.chain_of_custody.verify_all_integrity(trust_unchanged_stat=trust_unchanged_stat)
+        all_verified = all(verified.values())
         
         # Run compliance checks
         self.compliance_checker.check_acpo_principles(has_audit_trail, True)
@@ -606,13 +666,15 @@ class ForensicToolkitIntegration:
         """
         Finalize forensic case and generate all reports.
         
+        The audit log is closed afterwards, so nothing more can be logged
+        for the case through this instance.
+        
         Returns:
             Dictionary with all generated reports and compliance status
         """
-        # Generate all reports
+        # Generate all reports; the compliance report comes from the final check
         custody_report = self.chain_of_custody.generate_custody_report()
         audit_report = self.audit_logger.generate_audit_report()
-        compliance_report = self.compliance_checker.generate_compliance_report()
         
         # Final compliance check
         compliance_status = self.check_compliance()
@@ -623,6 +685,8 @@ class ForensicToolkitIntegration:
             details={'compliance_status': compliance_status['overall_status']},
             user=self.examiner
         )
+        self.audit_logger.flush(sync=True)
+        self.close()
         
         return {
             'case_id': self.case_id,
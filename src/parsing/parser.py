@@ -9,17 +9,22 @@ Parses WhatsApp SQLite databases to extract chats, messages, contacts, and call
 
 import sqlite3
 import os
+import sys
 import contextlib
 from pathlib import Path
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, fields
 from typing import List, Dict, Optional, Tuple, Any, Iterator
 from datetime import datetime
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Record classes drop the per-instance __dict__ where dataclasses support it
+# (Python 3.10+); parsed cases hold one instance per message
+_RECORD_OPTIONS = {'slots': True} if sys.version_info >= (3, 10) else {}
 
-@dataclass
+
+@dataclass(**_RECORD_OPTIONS)
 class Contact:
     """Represents a WhatsApp contact"""
     jid: str
@@ -33,7 +38,7 @@ class Contact:
             self.phone_number = self.jid.split("@")[0] if "@" in self.jid else self.jid
 
 
-@dataclass
+@dataclass(**_RECORD_OPTIONS)
 class Message:
     """Represents a WhatsApp message"""
     message_id: int
@@ -53,7 +58,14 @@ class Message:
         return datetime.fromtimestamp(self.timestamp / 1000)
 
 
-@dataclass
+# Message fields in declaration order, matching the MESSAGE_QUERIES column order
+MESSAGE_FIELDS = tuple(f.name for f in fields(Message))
+
+# Rows fetched from SQLite per round trip when building messages
+MESSAGE_FETCH_SIZE = 10000
+
+
+@dataclass(**_RECORD_OPTIONS)
 class Chat:
     """Represents a WhatsApp chat"""
     jid: str
@@ -71,7 +83,7 @@ class Chat:
         return None
 
 
-@dataclass
+@dataclass(**_RECORD_OPTIONS)
 class CallLog:
     """Represents a WhatsApp call log entry"""
     call_id: int
@@ -87,7 +99,7 @@ class CallLog:
         return datetime.fromtimestamp(self.timestamp / 1000)
 
 
-@dataclass
+@dataclass(**_RECORD_OPTIONS)
 class StatusUpdate:
     """Represents a WhatsApp status update"""
     status_id: int
@@ -101,7 +113,7 @@ class StatusUpdate:
         return datetime.fromtimestamp(self.timestamp / 1000)
 
 
-@dataclass
+@dataclass(**_RECORD_OPTIONS)
 class TimelineEvent:
     """Represents a unified event in the reconstruction timeline"""
     event_type: str  # 'message', 'call', 'status'
@@ -121,6 +133,73 @@ class WhatsAppParser:
     Extracts chats, messages, contacts, and call logs from msgstore.db, wa.db, and others.
     """
     
+    # Message queries for each known msgstore schema, newest first
+    MESSAGE_QUERIES = [
+        # Modern schema with joins (v3+)
+        """
+        SELECT 
+            m._id as message_id,
+            j.raw_string as chat_jid,
+            m.timestamp as timestamp,
+            m.from_me as from_me,
+            m.text_data as message_text,
+            m.message_type as media_type,
+            mm.file_path as media_path,
+            mm.media_caption as media_caption,
+            mq.message_row_id as quoted_message_id,
+            sender_jid.raw_string as remote_resource,
+            m.status as status
+        FROM message m
+        JOIN chat c ON m.chat_row_id = c._id
+        JOIN jid j ON c.jid_row_id = j._id
+        LEFT JOIN message_media mm ON m._id = mm.message_row_id
+        LEFT JOIN message_quoted mq ON m._id = mq.message_row_id
+        LEFT JOIN jid sender_jid ON m.sender_jid_row_id = sender_jid._id
+        """,
+        # Full schema with all columns (v2)
+        """
+        SELECT 
+            _id as message_id,
+            key_remote_jid as chat_jid,
+            timestamp as timestamp,
+            key_from_me as from_me,
+            data as message_text,
+            media_wa_type as media_type,
+            media_path as media_path,
+            media_caption as media_caption,
+            quoted_row_id as quoted_message_id,
+            remote_resource as remote_resource,
+            status as status
+        FROM message
+        """,
+        # Simple schema without media_path
+        """
+        SELECT 
+            _id as message_id,
+            key_remote_jid as chat_jid,
+            timestamp as timestamp,
+            key_from_me as from_me,
+            data as message_text,
+            media_wa_type as media_type
+        FROM message
+        """,
+        # Older schema with messages table
+        """
+        SELECT 
+            _id as message_id,
+            key_remote_jid as chat_jid,
+            timestamp as timestamp,
+            key_from_me as from_me,
+            data as message_text,
+            media_wa_type as media_type,
+            media_name as media_path
+        FROM messages
+        """
+    ]
+    
+    # Bound parameters per query; SQLite builds before 3.32 allow at most 999
+    MAX_QUERY_PARAMS = 900
+    
     def __init__(self, msgstore_db: str, wa_db: Optional[str] = None, 
                  status_db: Optional[str] = None, media_db: Optional[str] = None):
         """
@@ -408,129 +487,205 @@ class WhatsAppParser:
         Returns:
             List of Message objects
         """
-        messages = []
+        try:
+            messages = list(self.iter_messages(chat_jid, limit))
+            logger.info(f"Extracted {len(messages)} messages")
+        except Exception as e:
+            logger.error(f"Error extracting messages: {e}")
+            raise
+        
+        return messages
+
+    def iter_messages(self, chat_jid: Optional[str] = None, limit: Optional[int] = None) -> Iterator[Message]:
+        """
+        Stream messages from the database without holding them all in memory.
+        
+        Yields the same messages, in the same order, as get_messages().
+        
+        Args:
+            chat_jid: Optional JID to filter messages by chat
+            limit: Optional limit on number of messages to retrieve
+            
+        Returns:
+            Iterator over Message objects, oldest first
+        """
+        with self._get_cursor(self.msgstore_db) as cursor:
+            # Build query based on available schema - try multiple schemas
+            for base_query in self.MESSAGE_QUERIES:
+                query = base_query
+                params = []
+                if chat_jid:
+                    # Handle different column names for filtering
+                    query += f" WHERE {self._message_jid_column(base_query)} = ?"
+                    params.append(chat_jid)
+                
+                # Handle ORDER BY
+                query += f" ORDER BY {self._message_timestamp_column(base_query)} ASC"
+                
+                if limit:
+                    query += f" LIMIT {limit}"
+                
+                try:
+                    cursor.execute(query, params)
+                except sqlite3.OperationalError as e:
+                    logger.debug(f"Query failed: {e}")
+                    continue
+                
+                # Successfully executed; no other schema needs trying
+                yield from self._rows_to_messages(cursor)
+                return
+
+    def count_messages(self, chat_jid: Optional[str] = None) -> int:
+        """
+        Count messages without building Message objects.
+        
+        Counts over the same query get_messages() uses, so the result always
+        equals len(get_messages(chat_jid)).
+        
+        Args:
+            chat_jid: Optional JID to filter messages by chat
+            
+        Returns:
+            Number of messages
+        """
+        with self._get_cursor(self.msgstore_db) as cursor:
+            for base_query in self.MESSAGE_QUERIES:
+                query = base_query
+                params = []
+                if chat_jid:
+                    query += f" WHERE {self._message_jid_column(base_query)} = ?"
+                    params.append(chat_jid)
+                
+                try:
+                    cursor.execute(f"SELECT COUNT(*) FROM ({query})", params)
+                except sqlite3.OperationalError as e:
+                    logger.debug(f"Query failed: {e}")
+                    continue
+                
+                return cursor.fetchone()[0]
+        return 0
+
+    def get_messages_batch(
+        self,
+        chat_jids: List[str],
+        limit_per_chat: Optional[int] = None
+    ) -> Dict[str, List[Message]]:
+        """
+        Extract messages for several chats with one query per batch of chats.
+        
+        Returns the same messages as calling get_messages() for each chat,
+        including the per-chat limit (the oldest messages first).
+        
+        Args:
+            chat_jids: JIDs of the chats to load
+            limit_per_chat: Optional limit on number of messages per chat
+            
+        Returns:
+            Dictionary mapping chat JID to its list of Message objects
+        """
+        messages_by_chat: Dict[str, List[Message]] = {jid: [] for jid in chat_jids}
+        if not chat_jids:
+            return messages_by_chat
+        
+        # Per-chat limits need window functions (SQLite 3.25+)
+        if limit_per_chat and sqlite3.sqlite_version_info < (3, 25, 0):
+            for jid in chat_jids:
+                messages_by_chat[jid] = self.get_messages(jid, limit_per_chat)
+            return messages_by_chat
         
         try:
             with self._get_cursor(self.msgstore_db) as cursor:
-                # Build query based on available schema - try multiple schemas
-                queries_to_try = [
-                    # Modern schema with joins (v3+)
-                    """
-                    SELECT 
-                        m._id as message_id,
-                        j.raw_string as chat_jid,
-                        m.timestamp as timestamp,
-                        m.from_me as from_me,
-                        m.text_data as message_text,
-                        m.message_type as media_type,
-                        mm.file_path as media_path,
-                        mm.media_caption as media_caption,
-                        mq.message_row_id as quoted_message_id,
-                        sender_jid.raw_string as remote_resource,
-                        m.status as status
-                    FROM message m
-                    JOIN chat c ON m.chat_row_id = c._id
-                    JOIN jid j ON c.jid_row_id = j._id
-                    LEFT JOIN message_media mm ON m._id = mm.message_row_id
-                    LEFT JOIN message_quoted mq ON m._id = mq.message_row_id
-                    LEFT JOIN jid sender_jid ON m.sender_jid_row_id = sender_jid._id
-                    """,
-                    # Full schema with all columns (v2)
-                    """
-                    SELECT 
-                        _id as message_id,
-                        key_remote_jid as chat_jid,
-                        timestamp as timestamp,
-                        key_from_me as from_me,
-                        data as message_text,
-                        media_wa_type as media_type,
-                        media_path as media_path,
-                        media_caption as media_caption,
-                        quoted_row_id as quoted_message_id,
-                        remote_resource as remote_resource,
-                        status as status
-                    FROM message
-                    """,
-                    # Simple schema without media_path
-                    """
-                    SELECT 
-                        _id as message_id,
-                        key_remote_jid as chat_jid,
-                        timestamp as timestamp,
-                        key_from_me as from_me,
-                        data as message_text,
-                        media_wa_type as media_type
-                    FROM message
-                    """,
-                    # Older schema with messages table
-                    """
-                    SELECT 
-                        _id as message_id,
-                        key_remote_jid as chat_jid,
-                        timestamp as timestamp,
-                        key_from_me as from_me,
-                        data as message_text,
-                        media_wa_type as media_type,
-                        media_name as media_path
-                    FROM messages
-                    """
-                ]
-                
-                for base_query in queries_to_try:
+                for base_query in self.MESSAGE_QUERIES:
                     try:
-                        query = base_query
-                        params = []
-                        if chat_jid:
-                            # Handle different column names for filtering
-                            if "m.chat_row_id" in base_query:
-                                query += " WHERE j.raw_string = ?"
+                        jid_column = self._message_jid_column(base_query)
+                        timestamp_column = self._message_timestamp_column(base_query)
+                        # Stay below SQLite's default limit on bound parameters
+                        for i in range(0, len(chat_jids), self.MAX_QUERY_PARAMS):
+                            batch = chat_jids[i:i + self.MAX_QUERY_PARAMS]
+                            placeholders = ",".join("?" * len(batch))
+                            query = f"{base_query} WHERE {jid_column} IN ({placeholders})"
+                            params: List[Any] = list(batch)
+                            if limit_per_chat:
+                                query = f"""
+                                    SELECT * FROM (
+                                        SELECT q.*, ROW_NUMBER() OVER (
+                                            PARTITION BY q.chat_jid ORDER BY q.timestamp ASC, q.message_id ASC
+                                        ) AS chat_row_number
+                                        FROM ({query}) q
+                                    )
+                                    WHERE chat_row_number <= ?
+                                    ORDER BY timestamp ASC, message_id ASC
+                                """
+                                params.append(int(limit_per_chat))
                             else:
-                                query += " WHERE key_remote_jid = ?"
-                            params.append(chat_jid)
-                        
-                        # Handle ORDER BY
-                        if "m.timestamp" in base_query:
-                            query += " ORDER BY m.timestamp ASC"
-                        else:
-                            query += " ORDER BY timestamp ASC"
-                        
-                        if limit:
-                            query += f" LIMIT {limit}"
-                        
-                        cursor.execute(query, params)
-                        rows = cursor.fetchall()
-                        
-                        for row in rows:
-                            row_keys = row.keys()
-                            message = Message(
-                                message_id=row['message_id'],
-                                chat_jid=row['chat_jid'],
-                                timestamp=row['timestamp'],
-                                from_me=bool(row['from_me']),
-                                message_text=row['message_text'] if 'message_text' in row_keys else None,
-                                media_type=row['media_type'] if 'media_type' in row_keys else None,
-                                media_path=row['media_path'] if 'media_path' in row_keys else None,
-                                media_caption=row['media_caption'] if 'media_caption' in row_keys else None,
-                                quoted_message_id=row['quoted_message_id'] if 'quoted_message_id' in row_keys else None,
-                                remote_resource=row['remote_resource'] if 'remote_resource' in row_keys else None,
-                                status=row['status'] if 'status' in row_keys else None
-                            )
-                            messages.append(message)
-                        
-                        # Successfully executed, break out of loop
+                                query += f" ORDER BY {timestamp_column} ASC"
+                            
+                            cursor.execute(query, params)
+                            for message in self._rows_to_messages(cursor):
+                                messages_by_chat.setdefault(message.chat_jid, []).append(message)
                         break
                         
                     except sqlite3.OperationalError as e:
                         logger.debug(f"Query failed: {e}")
+                        for jid in chat_jids:
+                            messages_by_chat[jid] = []
                         continue
             
-            logger.info(f"Extracted {len(messages)} messages")
+            logger.info(
+                f"Extracted {sum(len(m) for m in messages_by_chat.values())} messages "
+                f"for {len(chat_jids)} chats"
+            )
             
         except Exception as e:
             logger.error(f"Error extracting messages: {e}")
             raise
         
-        return messages
+        return messages_by_chat
+
+    @staticmethod
+    def _message_jid_column(base_query: str) -> str:
+        """Column holding the chat JID in a message query"""
+        return "j.raw_string" if "m.chat_row_id" in base_query else "key_remote_jid"
+
+    @staticmethod
+    def _message_timestamp_column(base_query: str) -> str:
+        """Column holding the message timestamp in a message query"""
+        return "m.timestamp" if "m.timestamp" in base_query else "timestamp"
+
+    @staticmethod
+    def _rows_to_messages(cursor: sqlite3.Cursor) -> Iterator[Message]:
+        """
+        Build Messages from the rows of an executed MESSAGE_QUERIES query.
+        
+        Column positions are resolved once per query instead of by name on
+        every row, and rows are fetched as plain tuples in batches of
+        MESSAGE_FETCH_SIZE. Columns a schema lacks keep their defaults.
+        
+        Args:
+            cursor: Cursor the query was executed on (its row factory is reset)
+            
+        Returns:
+            Iterator over Message objects, in row order
+        """
+        cursor.row_factory = None
+        cursor.arraysize = MESSAGE_FETCH_SIZE
+        columns = [description[0] for description in cursor.description]
+        names = [name for name in MESSAGE_FIELDS if name in columns]
+        positions = [columns.index(name) for name in names]
+        
+        if positions == list(range(len(names))) and names == list(MESSAGE_FIELDS[:len(names)]):
+            # Every query selects its columns in Message field order
+            width = len(names)
+            while rows := cursor.fetchmany():
+                for row in rows:
+                    yield Message(row[0], row[1], row[2], bool(row[3]), *row[4:width])
+            return
+        
+        while rows := cursor.fetchmany():
+            for row in rows:
+                values = {name: row[position] for name, position in zip(names, positions)}
+                values['from_me'] = bool(values['from_me'])
+                yield Message(**values)
     
     def get_call_logs(self) -> List[CallLog]:
         """
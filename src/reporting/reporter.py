@@ -12,20 +12,86 @@ import csv
 import html
 from pathlib import Path
 from enum import Enum
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Any, TextIO
 from datetime import datetime
+from functools import lru_cache
 import logging
 
-from reportlab.lib import colors
-from reportlab.lib.pagesizes import letter
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-
 from ..parsing.parser import Chat, Message, Contact, CallLog
 
 logger = logging.getLogger(__name__)
 
 
+@lru_cache(maxsize=65536)
+def _format_timestamp(timestamp: int) -> str:
+    """Format a WhatsApp millisecond timestamp for display"""
+    return datetime.fromtimestamp(timestamp / 1000).strftime('%Y-%m-%d %H:%M:%S')
+
+
+# Per-chat view model keys used by rendered formats but not part of the JSON report
+_RENDER_ONLY_CHAT_KEYS = frozenset({"message_senders"})
+
+# Static stylesheet of the HTML report
+_HTML_REPORT_STYLE = """    <style>
+        body {
+            font-family: Arial, sans-serif;
+            margin: 20px;
+            background-color: #f5f5f5;
+        }
+        .header {
+            background-color: white;
+            padding: 20px;
+            margin-bottom: 20px;
+            border-radius: 5px;
+            box-shadow: 0 2px 4px rgba(0,0,0,0.1);
+        }
+        .section {
+            background-color: white;
+            padding: 20px;
+            margin-bottom: 20px;
+            border-radius: 5px;
+            box-shadow: 0 2px 4px rgba(0,0,0,0.1);
+        }
+        table {
+            width: 100%;
+            border-collapse: collapse;
+            margin-top: 10px;
+        }
+        th, td {
+            border: 1px solid #ddd;
+            padding: 8px;
+            text-align: left;
+        }
+        th {
+            background-color: #4CAF50;
+            color: white;
+        }
+        tr:nth-child(even) {
+            background-color: #f2f2f2;
+        }
+        .chat-message {
+            margin: 10px 0;
+            padding: 10px;
+            border-radius: 5px;
+        }
+        .message-from-me {
+            background-color: #DCF8C6;
+            text-align: right;
+        }
+        .message-from-other {
+            background-color: #FFFFFF;
+            text-align: left;
+        }
+        .timestamp {
+            color: #666;
+            font-size: 0.9em;
+        }
+        h1, h2 {
+            color: #333;
+        }
+    </style>"""
+
+
 class ReportFormat(Enum):
     """Report output formats"""
     HTML = "html"
@@ -51,13 +117,95 @@ class WhatsAppReporter:
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(parents=True, exist_ok=True)
     
+    def prepare_view_model(
+        self,
+        chats: List[Chat],
+        contacts: List[Contact],
+        call_logs: List[CallLog],
+        metadata: Optional[Dict] = None
+    ) -> Dict[str, Any]:
+        """
+        Serialize parsed data once so every report format can render from it.
+        
+        The view model has the layout of the JSON report, apart from the
+        render-only keys in _RENDER_ONLY_CHAT_KEYS, which are left out of it.
+        
+        Args:
+            chats: List of chats to include
+            contacts: List of contacts
+            call_logs: List of call logs
+            metadata: Optional metadata (company, examiner, notes, etc.)
+            
+        Returns:
+            Dictionary of plain Python values
+        """
+        chat_views = []
+        total_messages = 0
+        for chat in chats:
+            total_messages += len(chat.messages)
+            chat_views.append({
+                "jid": chat.jid,
+                "display_name": chat.display_name,
+                "is_group": chat.is_group,
+                "participants": chat.participants,
+                "message_count": chat.message_count,
+                "last_message_timestamp": chat.last_message_timestamp,
+                "messages": [
+                    {
+                        "message_id": msg.message_id,
+                        "timestamp": msg.timestamp,
+                        "from_me": msg.from_me,
+                        "message_text": msg.message_text,
+                        "media_type": msg.media_type,
+                        "media_path": msg.media_path,
+                        "status": msg.status
+                    }
+                    for msg in chat.messages
+                ],
+                # Group senders, one per message, for the PDF
+                "message_senders": [msg.remote_resource for msg in chat.messages] if chat.is_group else []
+            })
+        
+        return {
+            "metadata": metadata or {},
+            "generated_at": datetime.now().isoformat(),
+            "summary": {
+                "total_chats": len(chats),
+                "total_contacts": len(contacts),
+                "total_call_logs": len(call_logs),
+                "total_messages": total_messages
+            },
+            "contacts": [
+                {
+                    "jid": c.jid,
+                    "display_name": c.display_name,
+                    "phone_number": c.phone_number
+                }
+                for c in contacts
+            ],
+            "chats": chat_views,
+            "call_logs": [
+                {
+                    "call_id": call.call_id,
+                    "jid": call.jid,
+                    "timestamp": call.timestamp,
+                    "from_me": call.from_me,
+                    "duration": call.duration,
+                    "video_call": call.video_call,
+                    "call_result": call.call_result
+                }
+                for call in call_logs
+            ]
+        }
+    
     def generate_html_report(
         self,
         chats: List[Chat],
         contacts: List[Contact],
         call_logs: List[CallLog],
         metadata: Optional[Dict] = None,
-        output_file: Optional[str] = None
+        output_file: Optional[str] = None,
+        view_model: Optional[Dict[str, Any]] = None
     ) -> str:
         """
         Generate HTML forensic report.
@@ -68,6 +216,7 @@ class WhatsAppReporter:
             call_logs: List of call logs
             metadata: Optional metadata (company, examiner, notes, etc.)
             output_file: Optional output file path
+            view_model: Optional result of prepare_view_model() to render from
             
         Returns:
             Path to generated report
@@ -79,12 +228,11 @@ class WhatsAppReporter:
             output_file = Path(output_file)
             output_file.parent.mkdir(parents=True, exist_ok=True)
         
-        metadata = metadata or {}
+        if view_model is None:
+            view_model = self.prepare_view_model(chats, contacts, call_logs, metadata)
         
-        html_content = self._generate_html_content(chats, contacts, call_logs, metadata)
-        
-        with open(output_file, 'w', encoding='utf-8') as f:
-            f.write(html_content)
+        with open(output_file, 'w', encoding='utf-8', buffering=1 << 20) as f:
+            self._write_html_content(view_model, f)
         
         logger.info(f"Generated HTML report: {output_file}")
         return str(output_file)
@@ -96,7 +244,8 @@ class WhatsAppReporter:
         call_logs: List[CallLog],
         metadata: Optional[Dict] = None,
         output_file: Optional[str] = None,
-        selected_jids: Optional[List[str]] = None
+        selected_jids: Optional[List[str]] = None,
+        view_model: Optional[Dict[str, Any]] = None
     ) -> str:
         """
         Generate PDF forensic report with detailed chat conversations.
@@ -108,6 +257,7 @@ class WhatsAppReporter:
             metadata: Optional metadata
             output_file: Optional output file path
             selected_jids: Optional list of JIDs to filter chats
+            view_model: Optional result of prepare_view_model() to render from
             
         Returns:
             Path to generated report
@@ -119,7 +269,16 @@ class WhatsAppReporter:
             output_file = Path(output_file)
             output_file.parent.mkdir(parents=True, exist_ok=True)
             
-        metadata = metadata or {}
+        # reportlab is only imported when a PDF is actually requested
+        from reportlab.lib import colors
+        from reportlab.lib.pagesizes import letter
+        from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, PageBreak
+        from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+        
+        if view_model is None:
+            view_model = self.prepare_view_model(chats, contacts, call_logs, metadata)
+        metadata = view_model["metadata"]
+        summary = view_model["summary"]
         doc = SimpleDocTemplate(str(output_file), pagesize=letter)
         styles = getSampleStyleSheet()
         
@@ -179,9 +338,9 @@ class WhatsAppReporter:
         story.append(Paragraph("Summary", styles['Heading2']))
         summary_data = [
             ["Metric", "Count"],
-            ["Total Chats", str(len(chats))],
-            ["Total Contacts", str(len(contacts))],
-            ["Total Call Logs", str(len(call_logs))]
+            ["Total Chats", str(summary["total_chats"])],
+            ["Total Contacts", str(summary["total_contacts"])],
+            ["Total Call Logs", str(summary["total_call_logs"])]
         ]
         t = Table(summary_data, colWidths=[200, 200])
         t.setStyle(TableStyle([
@@ -194,12 +353,15 @@ class WhatsAppReporter:
         story.append(Spacer(1, 24))
         
         # Filter chats if JIDs provided
-        report_chats = chats
+        report_chats = view_model["chats"]
         if selected_jids:
-            report_chats = [c for c in chats if c.jid in selected_jids]
+            report_chats = [c for c in view_model["chats"] if c["jid"] in selected_jids]
             if not report_chats:
                 # Fallback to name search if no JID matches
-                report_chats = [c for c in chats if c.display_name and any(sj.lower() in c.display_name.lower() for sj in selected_jids)]
+                report_chats = [
+                    c for c in view_model["chats"]
+                    if c["display_name"] and any(sj.lower() in c["display_name"].lower() for sj in selected_jids)
+                ]
         
         # Limit total chats in PDF to avoid massive files if no selection
         if not selected_jids:
@@ -208,41 +370,41 @@ class WhatsAppReporter:
         story.append(Paragraph("Detailed Conversations", styles['Heading2']))
         
         for chat in report_chats:
-            from reportlab.platypus import PageBreak
             story.append(PageBreak())
             
-            chat_title = f"Chat: {chat.display_name or chat.jid}"
+            chat_title = f"Chat: {chat['display_name'] or chat['jid']}"
             story.append(Paragraph(chat_title, styles['Heading2']))
-            story.append(Paragraph(f"JID: {chat.jid}", styles['Normal']))
-            story.append(Paragraph(f"Type: {'Group' if chat.is_group else 'Individual'}", styles['Normal']))
-            if chat.participants:
-                story.append(Paragraph(f"Participants: {', '.join(chat.participants[:20])}", styles['Normal']))
+            story.append(Paragraph(f"JID: {chat['jid']}", styles['Normal']))
+            story.append(Paragraph(f"Type: {'Group' if chat['is_group'] else 'Individual'}", styles['Normal']))
+            if chat['participants']:
+                story.append(Paragraph(f"Participants: {', '.join(chat['participants'][:20])}", styles['Normal']))
             story.append(Spacer(1, 12))
             
             # Messages
-            if not chat.messages:
+            if not chat['messages']:
                 story.append(Paragraph("No messages found in this chat.", styles['Italic']))
                 continue
 
-            for msg in chat.messages:
-                ts_str = msg.get_datetime().strftime("%Y-%m-%d %H:%M:%S")
-                sender_name = "Me" if msg.from_me else (chat.display_name or "Other")
+            senders = chat['message_senders']
+            for i, msg in enumerate(chat['messages']):
+                ts_str = _format_timestamp(msg['timestamp'])
+                sender_name = "Me" if msg['from_me'] else (chat['display_name'] or "Other")
                 
                 # Remote resource for group chats
-                if chat.is_group and not msg.from_me and msg.remote_resource:
-                    sender_name = f"{sender_name} ({msg.remote_resource})"
+                if chat['is_group'] and not msg['from_me'] and senders[i]:
+                    sender_name = f"{sender_name} ({senders[i]})"
 
-                text = msg.message_text or ""
-                if not text and msg.media_type:
-                    text = f"[Media Type {msg.media_type}]"
-                    if msg.media_path:
-                        text += f" - {Path(msg.media_path).name}"
+                text = msg['message_text'] or ""
+                if not text and msg['media_type']:
+                    text = f"[Media Type {msg['media_type']}]"
+                    if msg['media_path']:
+                        text += f" - {Path(msg['media_path']).name}"
                 
                 if not text:
                     text = "[No Content]"
 
                 # Message bubble style
-                style_name = 'MeMessage' if msg.from_me else 'OtherMessage'
+                style_name = 'MeMessage' if msg['from_me'] else 'OtherMessage'
                 
                 story.append(Paragraph(ts_str, styles['Timestamp']))
                 story.append(Paragraph(f"<b>{sender_name}</b>: {text}", styles[style_name]))
@@ -252,14 +414,11 @@ class WhatsAppReporter:
         logger.info(f"Generated PDF report: {output_file}")
         return str(output_file)
 
-    def _generate_html_content(
-        self,
-        chats: List[Chat],
-        contacts: List[Contact],
-        call_logs: List[CallLog],
-        metadata: Dict
-    ) -> str:
-        """Generate HTML content"""
+    def _write_html_content(self, view_model: Dict[str, Any], fp: TextIO):
+        """Write HTML content to an open file, one section at a time"""
+        write = fp.write
+        metadata = view_model["metadata"]
+        summary = view_model["summary"]
         company = metadata.get('company', 'WhatsApp Forensics Report')
         examiner = metadata.get('examiner', 'Unknown')
         record = metadata.get('record', 'N/A')
@@ -267,70 +426,13 @@ class WhatsAppReporter:
         notes = metadata.get('notes', '')
         date = datetime.now().strftime('%d-%m-%Y')
         
-        html_content_str = f"""<!DOCTYPE html>
+        write(f"""<!DOCTYPE html>
 <html lang="en">
 <head>
     <meta charset="utf-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
     <title>WhatsApp Forensics Report - {date}</title>
-    <style>
-        body {{
-            font-family: Arial, sans-serif;
-            margin: 20px;
-            background-color: #f5f5f5;
-        }}
-        .header {{
-            background-color: white;
-            padding: 20px;
-            margin-bottom: 20px;
-            border-radius: 5px;
-            box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-        }}
-        .section {{
-            background-color: white;
-            padding: 20px;
-            margin-bottom: 20px;
-            border-radius: 5px;
-            box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-        }}
-        table {{
-            width: 100%;
-            border-collapse: collapse;
-            margin-top: 10px;
-        }}
-        th, td {{
-            border: 1px solid #ddd;
-            padding: 8px;
-            text-align: left;
-        }}
-        th {{
-            background-color: #4CAF50;
-            color: white;
-        }}
-        tr:nth-child(even) {{
-            background-color: #f2f2f2;
-        }}
-        .chat-message {{
-            margin: 10px 0;
-            padding: 10px;
-            border-radius: 5px;
-        }}
-        .message-from-me {{
-            background-color: #DCF8C6;
-            text-align: right;
-        }}
-        .message-from-other {{
-            background-color: #FFFFFF;
-            text-align: left;
-        }}
-        .timestamp {{
-            color: #666;
-            font-size: 0.9em;
-        }}
-        h1, h2 {{
-            color: #333;
-        }}
-    </style>
+{_HTML_REPORT_STYLE}
 </head>
 <body>
     <div class="header">
@@ -362,19 +464,19 @@ class WhatsAppReporter:
             </tr>
             <tr>
                 <td>Total Chats</td>
-                <td>{len(chats)}</td>
+                <td>{summary["total_chats"]}</td>
             </tr>
             <tr>
                 <td>Total Contacts</td>
-                <td>{len(contacts)}</td>
+                <td>{summary["total_contacts"]}</td>
             </tr>
             <tr>
                 <td>Total Call Logs</td>
-                <td>{len(call_logs)}</td>
+                <td>{summary["total_call_logs"]}</td>
             </tr>
             <tr>
                 <td>Total Messages</td>
-                <td>{sum(len(chat.messages) for chat in chats)}</td>
+                <td>{summary["total_messages"]}</td>
             </tr>
         </table>
     </div>
@@ -387,54 +489,53 @@ class WhatsAppReporter:
                 <th>Display Name</th>
                 <th>Phone Number</th>
             </tr>
-"""
+""")
         
-        for contact in contacts[:100]:  # Limit to first 100
-            html_content_str += f"""
+        for contact in view_model["contacts"][:100]:  # Limit to first 100
+            write(f"""
             <tr>
-                <td>{html.escape(contact.jid)}</td>
-                <td>{html.escape(contact.display_name or 'N/A')}</td>
-                <td>{html.escape(contact.phone_number or 'N/A')}</td>
+                <td>{html.escape(contact['jid'])}</td>
+                <td>{html.escape(contact['display_name'] or 'N/A')}</td>
+                <td>{html.escape(contact['phone_number'] or 'N/A')}</td>
             </tr>
-"""
+""")
         
-        html_content_str += """
+        write("""
         </table>
     </div>
     
     <div class="section">
         <h2>Chats</h2>
-"""
-        
-        for chat in chats[:20]:  # Limit to first 20 chats
-            html_content_str += f"""
-        <h3>{html.escape(chat.display_name or chat.jid)}</h3>
-        <p><strong>JID:</strong> {html.escape(chat.jid)}</p>
-        <p><strong>Type:</strong> {'Group' if chat.is_group else 'Individual'}</p>
-        <p><strong>Message Count:</strong> {chat.message_count}</p>
-"""
-            if chat.participants:
-                html_content_str += f"<p><strong>Participants:</strong> {', '.join(chat.participants[:10])}</p>"
+""")
+        
+        for chat in view_model["chats"][:20]:  # Limit to first 20 chats
+            write(f"""
+        <h3>{html.escape(chat['display_name'] or chat['jid'])}</h3>
+        <p><strong>JID:</strong> {html.escape(chat['jid'])}</p>
+        <p><strong>Type:</strong> {'Group' if chat['is_group'] else 'Individual'}</p>
+        <p><strong>Message Count:</strong> {chat['message_count']}</p>
+""")
+            if chat['participants']:
+                write(f"<p><strong>Participants:</strong> {', '.join(chat['participants'][:10])}</p>")
             
-            if chat.last_message_timestamp:
-                last_msg_dt = datetime.fromtimestamp(chat.last_message_timestamp / 1000)
-                html_content_str += f"<p><strong>Last Message:</strong> {last_msg_dt.strftime('%Y-%m-%d %H:%M:%S')}</p>"
+            if chat['last_message_timestamp']:
+                write(f"<p><strong>Last Message:</strong> {_format_timestamp(chat['last_message_timestamp'])}</p>")
             
             # Show recent messages
-            if chat.messages:
-                html_content_str += "<h4>Recent Messages</h4>"
-                for msg in chat.messages[-10:]:  # Last 10 messages
-                    msg_class = "message-from-me" if msg.from_me else "message-from-other"
-                    msg_time = msg.get_datetime().strftime('%Y-%m-%d %H:%M:%S')
-                    msg_text = html.escape(msg.message_text or '[Media]' if msg.media_type else '[No content]')
-                    html_content_str += f"""
+            if chat['messages']:
+                write("<h4>Recent Messages</h4>")
+                for msg in chat['messages'][-10:]:  # Last 10 messages
+                    msg_class = "message-from-me" if msg['from_me'] else "message-from-other"
+                    msg_time = _format_timestamp(msg['timestamp'])
+                    msg_text = html.escape(msg['message_text'] or '[Media]' if msg['media_type'] else '[No content]')
+                    write(f"""
                     <div class="chat-message {msg_class}">
                         <div class="timestamp">{msg_time}</div>
                         <div>{msg_text}</div>
                     </div>
-"""
+""")
         
-        html_content_str += """
+        write("""
     </div>
     
     <div class="section">
@@ -447,29 +548,28 @@ class WhatsAppReporter:
                 <th>Type</th>
                 <th>Duration (seconds)</th>
             </tr>
-"""
+""")
         
-        for call in call_logs[:100]:  # Limit to first 100
-            call_time = call.get_datetime().strftime('%Y-%m-%d %H:%M:%S')
-            direction = "Outgoing" if call.from_me else "Incoming"
-            call_type = "Video" if call.video_call else "Audio"
-            html_content_str += f"""
+        for call in view_model["call_logs"][:100]:  # Limit to first 100
+            call_time = _format_timestamp(call['timestamp'])
+            direction = "Outgoing" if call['from_me'] else "Incoming"
+            call_type = "Video" if call['video_call'] else "Audio"
+            write(f"""
             <tr>
                 <td>{call_time}</td>
-                <td>{html.escape(call.jid)}</td>
+                <td>{html.escape(call['jid'])}</td>
                 <td>{direction}</td>
                 <td>{call_type}</td>
-                <td>{call.duration}</td>
+                <td>{call['duration']}</td>
             </tr>
-"""
+""")
         
-        html_content_str += """
+        write("""
         </table>
     </div>
 </body>
 </html>
-"""
-        return html_content_str
+""")
     
     def generate_json_report(
         self,
@@ -477,7 +577,8 @@ class WhatsAppReporter:
         contacts: List[Contact],
         call_logs: List[CallLog],
         metadata: Optional[Dict] = None,
-        output_file: Optional[str] = None
+        output_file: Optional[str] = None,
+        view_model: Optional[Dict[str, Any]] = None
     ) -> str:
         """
         Generate JSON forensic report.
@@ -488,6 +589,7 @@ class WhatsAppReporter:
             call_logs: List of call logs
             metadata: Optional metadata
             output_file: Optional output file path
+            view_model: Optional result of prepare_view_model() to render from
             
         Returns:
             Path to generated report
@@ -499,62 +601,18 @@ class WhatsAppReporter:
             output_file = Path(output_file)
             output_file.parent.mkdir(parents=True, exist_ok=True)
         
-        report_data = {
-            "metadata": metadata or {},
-            "generated_at": datetime.now().isoformat(),
-            "summary": {
-                "total_chats": len(chats),
-                "total_contacts": len(contacts),
-                "total_call_logs": len(call_logs),
-                "total_messages": sum(len(chat.messages) for chat in chats)
-            },
-            "contacts": [
-                {
-                    "jid": c.jid,
-                    "display_name": c.display_name,
-                    "phone_number": c.phone_number
-                }
-                for c in contacts
-            ],
-            "chats": [
-                {
-                    "jid": chat.jid,
-                    "display_name": chat.display_name,
-                    "is_group": chat.is_group,
-                    "participants": chat.participants,
-                    "message_count": chat.message_count,
-                    "last_message_timestamp": chat.last_message_timestamp,
-                    "messages": [
-                        {
-                            "message_id": msg.message_id,
-                            "timestamp": msg.timestamp,
-                            "from_me": msg.from_me,
-                            "message_text": msg.message_text,
-                            "media_type": msg.media_type,
-                            "media_path": msg.media_path,
-                            "status": msg.status
-                        }
-                        for msg in chat.messages
-                    ]
-                }
-                for chat in chats
-            ],
-            "call_logs": [
-                {
-                    "call_id": call.call_id,
-                    "jid": call.jid,
-                    "timestamp": call.timestamp,
-                    "from_me": call.from_me,
-                    "duration": call.duration,
-                    "video_call": call.video_call,
-                    "call_result": call.call_result
-                }
-                for call in call_logs
-            ]
-        }
+        if view_model is None:
+            view_model = self.prepare_view_model(chats, contacts, call_logs, metadata)
+        
+        # Chats are copied shallowly to drop render-only keys; messages are shared
+        report = dict(view_model)
+        report["chats"] = [
+            {key: value for key, value in chat.items() if key not in _RENDER_ONLY_CHAT_KEYS}
+            for chat in view_model["chats"]
+        ]
         
         with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(report_data, f, indent=2, ensure_ascii=False)
+            json.dump(report, f, indent=2, ensure_ascii=False)
         
         logger.info(f"Generated JSON report: {output_file}")
         return str(output_file)
@@ -564,7 +622,8 @@ class WhatsAppReporter:
         chats: List[Chat],
         contacts: List[Contact],
         call_logs: List[CallLog],
-        output_dir: Optional[str] = None
+        output_dir: Optional[str] = None,
+        view_model: Optional[Dict[str, Any]] = None
     ) -> List[str]:
         """
         Generate CSV reports (separate files for chats, messages, contacts, calls).
@@ -574,6 +633,7 @@ class WhatsAppReporter:
             contacts: List of contacts
             call_logs: List of call logs
             output_dir: Optional output directory
+            view_model: Optional result of prepare_view_model() to render from
             
         Returns:
             List of generated CSV file paths
@@ -584,6 +644,9 @@ class WhatsAppReporter:
             output_dir = Path(output_dir)
             output_dir.mkdir(parents=True, exist_ok=True)
         
+        if view_model is None:
+            view_model = self.prepare_view_model(chats, contacts, call_logs)
+        
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         generated_files = []
         
@@ -592,8 +655,8 @@ class WhatsAppReporter:
         with open(contacts_file, 'w', newline='', encoding='utf-8') as f:
             writer = csv.writer(f)
             writer.writerow(['JID', 'Display Name', 'Phone Number'])
-            for contact in contacts:
-                writer.writerow([contact.jid, contact.display_name or '', contact.phone_number or ''])
+            for contact in view_model["contacts"]:
+                writer.writerow([contact['jid'], contact['display_name'] or '', contact['phone_number'] or ''])
         generated_files.append(str(contacts_file))
         
         # Messages CSV
@@ -601,35 +664,35 @@ class WhatsAppReporter:
         with open(messages_file, 'w', newline='', encoding='utf-8') as f:
             writer = csv.writer(f)
             writer.writerow(['Message ID', 'Chat JID', 'Timestamp', 'From Me', 'Message Text', 'Media Type', 'Media Path', 'Status'])
-            for chat in chats:
-                for msg in chat.messages:
+            for chat in view_model["chats"]:
+                for msg in chat['messages']:
                     writer.writerow([
-                        msg.message_id,
-                        msg.chat_jid,
-                        msg.timestamp,
-                        msg.from_me,
-                        msg.message_text or '',
-                        msg.media_type or '',
-                        msg.media_path or '',
-                        msg.status or ''
+                        msg['message_id'],
+                        chat['jid'],
+                        msg['timestamp'],
+                        msg['from_me'],
+                        msg['message_text'] or '',
+                        msg['media_type'] or '',
+                        msg['media_path'] or '',
+                        msg['status'] or ''
                     ])
         generated_files.append(str(messages_file))
         
         # Call logs CSV
-        if call_logs:
+        if view_model["call_logs"]:
             calls_file = output_dir / f"calls_{timestamp}.csv"
             with open(calls_file, 'w', newline='', encoding='utf-8') as f:
                 writer = csv.writer(f)
                 writer.writerow(['Call ID', 'JID', 'Timestamp', 'From Me', 'Duration', 'Video Call', 'Call Result'])
-                for call in call_logs:
+                for call in view_model["call_logs"]:
                     writer.writerow([
-                        call.call_id,
-                        call.jid,
-                        call.timestamp,
-                        call.from_me,
-                        call.duration,
-                        call.video_call,
-                        call.call_result or ''
+                        call['call_id'],
+                        call['jid'],
+                        call['timestamp'],
+                        call['from_me'],
+                        call['duration'],
+                        call['video_call'],
+                        call['call_result'] or ''
                     ])
             generated_files.append(str(calls_file))
         
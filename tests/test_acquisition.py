@@ -5,8 +5,10 @@
 Tests for acquisition module
 """
 
+import hashlib
 import pytest
 import tempfile
+import shlex
 import shutil
 from pathlib import Path
 
@@ -14,6 +16,16 @@ from src.acquisition import WhatsAppAcquirer, AcquisitionSource
 from src.acquisition import acquirer as acquirer_module
 
 
+def existing_dirs(probe_script: str) -> str:
+    """Answer an adb path probe as if only the probed directories exist"""
+    lines = []
+    for check in probe_script.split(" ; "):
+        _, flag, path = shlex.split(check)[:3]
+        if flag == "-d":
+            lines.append(path)
+    return "\r\n".join(lines) + "\r\n"
+
+
 class TestWhatsAppAcquirer:
     """Test WhatsAppAcquirer class"""
     
@@ -43,6 +55,313 @@ class TestWhatsAppAcquirer:
             assert len(acquired) > 0
             assert any("msgstore" in str(p) for p in acquired.values())
     
+    def test_acquire_from_files_name_collisions(self):
+        """Test same-named databases from different folders are all kept"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            source_dir = Path(tmpdir) / "source"
+            (source_dir / "WhatsApp").mkdir(parents=True)
+            (source_dir / "WhatsApp Business").mkdir()
+            (source_dir / "WhatsApp" / "msgstore.db").write_bytes(b"personal")
+            (source_dir / "WhatsApp Business" / "msgstore.db").write_bytes(b"business")
+            
+            acquirer = WhatsAppAcquirer(output_dir=str(Path(tmpdir) / "out"))
+            acquired = acquirer.acquire_from_files(str(source_dir))
+            
+            assert len(acquired) == 2
+            assert len(set(acquired.values())) == 2
+            contents = {Path(p).read_bytes() for p in acquired.values()}
+            assert contents == {b"personal", b"business"}
+            assert any(Path(p).name == "msgstore.db" for p in acquired.values())
+    
+    def test_acquire_from_files_media(self):
+        """Test Media folder is copied with its directory structure"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            source_dir = Path(tmpdir) / "source"
+            images_dir = source_dir / "Media" / "WhatsApp Images"
+            images_dir.mkdir(parents=True)
+            (source_dir / "Media" / "WhatsApp Voice Notes").mkdir()
+            (source_dir / "msgstore.db").write_bytes(b"db")
+            (images_dir / "IMG-0001.jpg").write_bytes(b"jpeg data")
+            
+            acquirer = WhatsAppAcquirer(output_dir=str(Path(tmpdir) / "out"))
+            acquired = acquirer.acquire_from_files(str(source_dir))
+            
+            dest_media = Path(acquired[str(source_dir.resolve() / "Media")])
+            assert (dest_media / "WhatsApp Images" / "IMG-0001.jpg").read_bytes() == b"jpeg data"
+            assert (dest_media / "WhatsApp Voice Notes").is_dir()
+    
+    def test_acquire_from_files_targets_inside_media(self):
+        """Test database files inside Media are still acquired individually"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            source_dir = Path(tmpdir) / "source"
+            backup_dir = source_dir / "Media" / "Backups"
+            backup_dir.mkdir(parents=True)
+            (source_dir / "msgstore.db").write_bytes(b"db")
+            (backup_dir / "msgstore-2024-01-01.1.db.crypt14").write_bytes(b"old backup")
+            
+            acquirer = WhatsAppAcquirer(output_dir=str(Path(tmpdir) / "out"))
+            acquired = acquirer.acquire_from_files(str(source_dir))
+            
+            backup = str(source_dir.resolve() / "Media" / "Backups" / "msgstore-2024-01-01.1.db.crypt14")
+            assert Path(acquired[backup]).read_bytes() == b"old backup"
+            assert acquirer.get_acquisition_summary(acquired)["sha256"][acquired[backup]] == (
+                hashlib.sha256(b"old backup").hexdigest()
+            )
+            dest_media = Path(acquired[str(source_dir.resolve() / "Media")])
+            assert (dest_media / "Backups" / "msgstore-2024-01-01.1.db.crypt14").exists()
+
+    def test_acquire_from_files_media_links_and_special_files(self):
+        """Test Media copies linked folders and folder times, and skips special files"""
+        import os
+        
+        if not hasattr(os, "mkfifo"):
+            pytest.skip("FIFOs not supported")
+        with tempfile.TemporaryDirectory() as tmpdir:
+            source_dir = Path(tmpdir) / "source"
+            media_dir = source_dir / "Media"
+            media_dir.mkdir(parents=True)
+            (source_dir / "msgstore.db").write_bytes(b"db")
+            backups = Path(tmpdir) / "backups"
+            backups.mkdir()
+            (backups / "VID-0001.mp4").write_bytes(b"video")
+            (media_dir / "WhatsApp Video").symlink_to(backups, target_is_directory=True)
+            (media_dir / "loop").symlink_to(media_dir, target_is_directory=True)
+            os.mkfifo(media_dir / "pipe")
+            os.utime(media_dir, (1_600_000_000, 1_600_000_000))
+            
+            acquirer = WhatsAppAcquirer(output_dir=str(Path(tmpdir) / "out"))
+            acquired = acquirer.acquire_from_files(str(source_dir))
+            
+            dest_media = Path(acquired[str(source_dir.resolve() / "Media")])
+            assert (dest_media / "WhatsApp Video" / "VID-0001.mp4").read_bytes() == b"video"
+            assert not (dest_media / "pipe").exists()
+            assert not (dest_media / "loop").exists()
+            assert dest_media.stat().st_mtime == 1_600_000_000
+
+    def test_acquire_from_files_summary_matches_disk(self):
+        """Test the summary built during the copy matches one read from disk"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            source_dir = Path(tmpdir) / "source"
+            (source_dir / "Media").mkdir(parents=True)
+            (source_dir / "msgstore.db").write_bytes(b"db")
+            (source_dir / "msgstore.db.crypt14").write_bytes(b"encrypted")
+            (source_dir / "key").write_bytes(b"k" * 158)
+            (source_dir / "Media" / "IMG-0001.jpg").write_bytes(b"jpeg data")
+
+            acquirer = WhatsAppAcquirer(output_dir=str(Path(tmpdir) / "out"))
+            acquired = acquirer.acquire_from_files(str(source_dir))
+            summary = acquirer.get_acquisition_summary(acquired)
+
+            acquirer._last_summary = None
+            assert summary == acquirer.get_acquisition_summary(acquired, compute_hashes=True)
+            assert acquirer.get_acquisition_summary(acquired)["sha256"] == summary["sha256"]
+            assert summary["total_files"] == 4
+            assert summary["total_size_bytes"] == 2 + 9 + 158 + 9
+            key_copy = acquired[str(source_dir.resolve() / "key")]
+            assert summary["sha256"][key_copy] == hashlib.sha256(b"k" * 158).hexdigest()
+
+    def test_acquire_from_android_adb_no_ready_device(self, monkeypatch, tmp_path):
+        """Header line and unauthorized devices do not count as connected"""
+
+        class FakeCompleted:
+            stdout = b"List of devices attached\nFAKEDEVICE\tunauthorized\n\n"
+            stderr = b""
+            returncode = 0
+
+        monkeypatch.setattr(acquirer_module.subprocess, "run", lambda cmd, **kwargs: FakeCompleted())
+        monkeypatch.setattr(acquirer_module.shutil, "which", lambda name: name)
+        acquirer = WhatsAppAcquirer(output_dir=str(tmp_path))
+        with pytest.raises(RuntimeError, match="No Android device connected"):
+            acquirer.acquire_from_android_adb()
+    
+    def test_acquire_from_android_adb_without_adb(self, monkeypatch, tmp_path):
+        """Missing adb binary is reported before any command is spawned"""
+        monkeypatch.setattr(acquirer_module.shutil, "which", lambda name: None)
+        acquirer = WhatsAppAcquirer(output_dir=str(tmp_path))
+        with pytest.raises(RuntimeError, match="ADB not found"):
+            acquirer.acquire_from_android_adb()
+    
+    def test_acquire_from_android_adb_async(self, monkeypatch, tmp_path):
+        """The awaitable entry point returns the synchronous result"""
+        import asyncio
+        
+        acquirer = WhatsAppAcquirer(output_dir=str(tmp_path))
+        calls = []
+        
+        def fake_acquire(device_id=None, include_media=False):
+            calls.append((device_id, include_media))
+            return {"/sdcard/WhatsApp/Databases/msgstore.db.crypt14": str(tmp_path / "msgstore.db.crypt14")}
+        
+        monkeypatch.setattr(acquirer, "acquire_from_android_adb", fake_acquire)
+        acquired = asyncio.run(acquirer.acquire_from_android_adb_async("SERIAL", include_media=True))
+        
+        assert calls == [("SERIAL", True)]
+        assert len(acquired) == 1
+    
+    def test_acquire_from_android_adb_skips_files_covered_by_folder_pulls(self, monkeypatch, tmp_path):
+        """Backups inside a pulled Databases folder are not pulled a second time"""
+        pulled = []
+        
+        class FakeCompleted:
+            def __init__(self, stdout="", returncode=0):
+                self.stdout = stdout
+                self.stderr = b""
+                self.returncode = returncode
+        
+        def fake_run(cmd, **kwargs):
+            if cmd[1:] == ["devices"]:
+                return FakeCompleted(stdout=b"List of devices attached\nFAKEDEVICE\tdevice\n\n")
+            if cmd[3:5] == ["shell", "su"]:
+                return FakeCompleted(stdout="databases\n")
+            if cmd[3] == "shell" and cmd[4].startswith("test "):
+                return FakeCompleted(stdout="\n".join(shlex.split(c)[2] for c in cmd[4].split(" ; ")))
+            if cmd[3] == "pull":
+                pulled.append(cmd[4])
+                dest = Path(cmd[5])
+                if dest.suffix or dest.name == "key":
+                    dest.parent.mkdir(parents=True, exist_ok=True)
+                    dest.touch()
+                else:
+                    dest.mkdir(parents=True, exist_ok=True)
+                return FakeCompleted()
+            return FakeCompleted(returncode=1)
+        
+        monkeypatch.setattr(acquirer_module.subprocess, "run", fake_run)
+        monkeypatch.setattr(acquirer_module.shutil, "which", lambda name: name)
+        acquirer = WhatsAppAcquirer(output_dir=str(tmp_path))
+        acquirer.acquire_from_android_adb()
+        
+        assert "/data/data/com.whatsapp/databases/msgstore.db" in pulled
+        assert "/sdcard/WhatsApp/Databases" in pulled
+        assert not [p for p in pulled if p.startswith("/sdcard/") and ".crypt" in p]
+    
+    def test_adb_probe_reused_between_acquisitions(self, monkeypatch, tmp_path):
+        """Back-to-back acquisitions share one device and root probe"""
+        probes = []
+        
+        class FakeCompleted:
+            def __init__(self, stdout="", returncode=0):
+                self.stdout = stdout
+                self.stderr = b""
+                self.returncode = returncode
+        
+        def fake_run(cmd, **kwargs):
+            if cmd[1:] == ["devices"]:
+                probes.append("devices")
+                return FakeCompleted(stdout=b"List of devices attached\nFAKEDEVICE\tdevice\n\n")
+            if cmd[3:5] == ["shell", "su"]:
+                probes.append("root")
+                return FakeCompleted(returncode=1)
+            return FakeCompleted(returncode=1)
+        
+        monkeypatch.setattr(acquirer_module.subprocess, "run", fake_run)
+        monkeypatch.setattr(acquirer_module.shutil, "which", lambda name: name)
+        acquirer = WhatsAppAcquirer(output_dir=str(tmp_path))
+        acquirer.acquire_from_android_adb()
+        acquirer.acquire_from_android_adb()
+        
+        assert probes == ["devices", "root"]
+    
+    def test_probe_device_paths_quotes_paths(self, monkeypatch, tmp_path):
+        """Paths with spaces reach the device shell as single quoted words"""
+        scripts = []
+        
+        class FakeCompleted:
+            stdout = "/sdcard/WhatsApp Business/Databases\r\n"
+            stderr = ""
+            returncode = 0
+        
+        def fake_run(cmd, **kwargs):
+            scripts.append(cmd)
+            return FakeCompleted()
+        
+        monkeypatch.setattr(acquirer_module.subprocess, "run", fake_run)
+        acquirer = WhatsAppAcquirer(output_dir=str(tmp_path))
+        jobs = [
+            ("/sdcard/WhatsApp Business/Databases", tmp_path / "databases", True),
+            ("/sdcard/WhatsApp Business/Databases/msgstore.db.crypt14", tmp_path / "msgstore.db.crypt14", False),
+        ]
+        
+        existing = acquirer._probe_device_paths(["adb", "-s", "FAKEDEVICE"], jobs)
+        
+        assert existing == {"/sdcard/WhatsApp Business/Databases"}
+        assert len(scripts) == 1
+        assert scripts[0][:4] == ["adb", "-s", "FAKEDEVICE", "shell"]
+        checks = [shlex.split(check) for check in scripts[0][4].split(" ; ")]
+        assert checks[0] == ["test", "-d", "/sdcard/WhatsApp Business/Databases",
+                             "&&", "echo", "/sdcard/WhatsApp Business/Databases"]
+        assert checks[1][1:3] == ["-f", "/sdcard/WhatsApp Business/Databases/msgstore.db.crypt14"]
+    
+    def test_run_pull_jobs_respects_deadline(self, monkeypatch, tmp_path):
+        """No pull is started once the acquisition deadline has passed"""
+        import time
+        
+        def fail_run(cmd, **kwargs):
+            raise AssertionError(f"unexpected command: {cmd}")
+        
+        monkeypatch.setattr(acquirer_module.subprocess, "run", fail_run)
+        acquirer = WhatsAppAcquirer(output_dir=str(tmp_path))
+        jobs = [("/sdcard/WhatsApp/Databases", tmp_path / "databases", True)]
+        
+        assert acquirer._run_pull_jobs(["adb"], jobs, time.monotonic() - 1) == []
+    
+    def test_fast_copy_preserves_content_and_mtime(self, tmp_path):
+        """Test in-kernel copy keeps data and timestamps"""
+        import os
+        src = tmp_path / "msgstore.db.crypt14"
+        src.write_bytes(os.urandom(300_000))
+        os.utime(src, (1_600_000_000, 1_600_000_000))
+        dst = tmp_path / "copy.crypt14"
+        
+        WhatsAppAcquirer._fast_copy(src, dst)
+        
+        assert dst.read_bytes() == src.read_bytes()
+        assert dst.stat().st_mtime == src.stat().st_mtime
+    
+    def test_fast_copy_falls_back_when_copy_file_range_fails(self, monkeypatch, tmp_path):
+        """Test sendfile fallback when copy_file_range is unsupported"""
+        import errno
+        import os
+        
+        def unsupported(*args, **kwargs):
+            raise OSError(errno.EXDEV, "Invalid cross-device link")
+        
+        monkeypatch.setattr(acquirer_module.os, "copy_file_range", unsupported, raising=False)
+        src = tmp_path / "wa.db"
+        src.write_bytes(os.urandom(70_000))
+        dst = tmp_path / "wa_copy.db"
+        
+        assert WhatsAppAcquirer._fast_copy(str(src), str(dst)) == 70_000
+        assert dst.read_bytes() == src.read_bytes()
+    
+    def test_copy_workers_reduced_on_rotational_disk(self, monkeypatch, tmp_path):
+        """Spinning disks get fewer concurrent copies than SSDs"""
+        acquirer = WhatsAppAcquirer(output_dir=str(tmp_path))
+        
+        monkeypatch.setattr(WhatsAppAcquirer, "_is_rotational", staticmethod(lambda path: True))
+        assert acquirer._copy_workers(str(tmp_path)) == acquirer_module.COPY_ROTATIONAL_WORKERS
+        
+        monkeypatch.setattr(WhatsAppAcquirer, "_is_rotational", staticmethod(lambda path: False))
+        assert 1 <= acquirer._copy_workers(str(tmp_path)) <= acquirer_module.COPY_MAX_WORKERS
+    
+    def test_fast_copy_finishes_short_copy_file_range(self, monkeypatch, tmp_path):
+        """Test sendfile completes a copy that copy_file_range stopped early"""
+        import os
+        real_copy_file_range = os.copy_file_range
+        
+        def first_chunk_only(src_fd, dst_fd, count, offset_src=None, offset_dst=None):
+            if offset_src:
+                return 0
+            return real_copy_file_range(src_fd, dst_fd, min(count, 4096), offset_src, offset_dst)
+        
+        monkeypatch.setattr(acquirer_module.os, "copy_file_range", first_chunk_only)
+        src = tmp_path / "msgstore.db"
+        src.write_bytes(os.urandom(50_000))
+        dst = tmp_path / "msgstore_copy.db"
+        
+        assert WhatsAppAcquirer._fast_copy(str(src), str(dst)) == 50_000
+        assert dst.read_bytes() == src.read_bytes()
+    
     def test_verify_database(self):
         """Test database verification"""
         with tempfile.TemporaryDirectory() as tmpdir:
@@ -61,6 +380,27 @@ class TestWhatsAppAcquirer:
             invalid_db = Path(tmpdir) / "invalid.db"
             invalid_db.write_text("not a database")
             assert acquirer.verify_database(str(invalid_db)) is False
+            assert acquirer.verify_database(str(invalid_db), deep=False) is False
+            
+            # Header-only check accepts a file whose body is not a database
+            header_only = Path(tmpdir) / "header_only.db"
+            header_only.write_bytes(b"SQLite format 3\x00" + b"\x00" * 10)
+            assert acquirer.verify_database(str(header_only), deep=False) is True
+            assert acquirer.verify_database(str(test_db), deep=False) is True
+    
+    def test_verify_database_leaves_no_side_files(self, tmp_path):
+        """Verification creates no journal files, even for paths needing URI escaping"""
+        import sqlite3
+        case_dir = tmp_path / "case #1 ?"
+        case_dir.mkdir()
+        test_db = case_dir / "msgstore.db"
+        conn = sqlite3.connect(test_db)
+        conn.execute("CREATE TABLE test (id INTEGER)")
+        conn.close()
+        
+        acquirer = WhatsAppAcquirer(output_dir=str(tmp_path / "out"))
+        assert acquirer.verify_database(str(test_db)) is True
+        assert [p.name for p in case_dir.iterdir()] == ["msgstore.db"]
     
     def test_get_acquisition_summary(self):
         """Test acquisition summary"""
@@ -92,6 +432,35 @@ class TestWhatsAppAcquirer:
             assert len(summary["databases"]) > 0
             assert len(summary["encrypted_databases"]) > 0
             assert len(summary["keys"]) > 0
+            assert summary["sha256"] == {}
+            
+            hashed = acquirer.get_acquisition_summary(acquired, compute_hashes=True)
+            assert hashed["sha256"][str(key_file)] == hashlib.sha256(b"").hexdigest()
+
+    def test_get_acquisition_summary_is_remembered(self, monkeypatch, tmp_path):
+        """Repeated summaries of the same result do not stat the files again"""
+        import os
+        
+        key_file = tmp_path / "key"
+        key_file.write_bytes(b"k" * 158)
+        acquired = {"/data/data/com.whatsapp/files/key": str(key_file)}
+        acquirer = WhatsAppAcquirer(output_dir=str(tmp_path / "out"))
+        first = acquirer.get_acquisition_summary(acquired)
+        
+        real_stat = os.stat
+        stat_calls = []
+        
+        def counting_stat(path, *args, **kwargs):
+            stat_calls.append(path)
+            return real_stat(path, *args, **kwargs)
+        
+        monkeypatch.setattr(acquirer_module.os, "stat", counting_stat)
+        assert acquirer.get_acquisition_summary(acquired) == first
+        assert stat_calls == []
+        
+        acquired["/sdcard/extra"] = str(key_file)
+        assert acquirer.get_acquisition_summary(acquired)["total_files"] == 2
+        assert stat_calls
 
     def test_sanitize_device_label(self):
         with tempfile.TemporaryDirectory() as tmpdir:
@@ -108,15 +477,15 @@ class TestWhatsAppAcquirer:
                 self.stderr = stderr
                 self.returncode = returncode
 
-        def fake_run(cmd, capture_output=False, text=False, timeout=None):
+        def fake_run(cmd, **kwargs):
             if cmd[:2] == ["adb", "devices"]:
-                return FakeCompleted(stdout="FAKEDEVICE\tdevice\n")
+                return FakeCompleted(stdout=b"List of devices attached\nFAKEDEVICE\tdevice\n\n")
             if cmd[:3] == ["adb", "-s", "FAKEDEVICE"] and cmd[3:6] == ["shell", "getprop", "ro.product.model"]:
                 return FakeCompleted(stdout="Pixel 7\n")
             if cmd[:3] == ["adb", "-s", "FAKEDEVICE"] and cmd[3:6] == ["shell", "su", "-c"]:
                 return FakeCompleted(stdout="", returncode=1)
-            if cmd[:3] == ["adb", "-s", "FAKEDEVICE"] and cmd[3:6] == ["shell", "test", "-d"]:
-                return FakeCompleted(stdout="exists\n")
+            if cmd[:3] == ["adb", "-s", "FAKEDEVICE"] and cmd[3] == "shell" and cmd[4].startswith("test "):
+                return FakeCompleted(stdout=existing_dirs(cmd[4]))
             if cmd[:3] == ["adb", "-s", "FAKEDEVICE"] and cmd[3] == "pull":
                 dest = Path(cmd[-1])
                 if dest.suffix:
@@ -130,6 +499,7 @@ class TestWhatsAppAcquirer:
             return FakeCompleted(stdout="", returncode=0)
 
         monkeypatch.setattr(acquirer_module.subprocess, "run", fake_run)
+        monkeypatch.setattr(acquirer_module.shutil, "which", lambda name: name)
 
         acquirer = WhatsAppAcquirer(output_dir=str(tmp_path))
         acquired = acquirer.acquire_from_android_adb()
@@ -140,3 +510,41 @@ class TestWhatsAppAcquirer:
         assert first_local.parent.name == "databases"
         assert first_local.parent.parent.name == "Pixel_7"
         assert first_local.parent.parent.parent.name == "android_adb"
+
+    def test_acquire_from_android_adb_media_and_databases(self, monkeypatch, tmp_path):
+        """Media and database pulls both land in their per-device folders"""
+
+        class FakeCompleted:
+            def __init__(self, stdout: str = "", stderr: str = "", returncode: int = 0):
+                self.stdout = stdout
+                self.stderr = stderr
+                self.returncode = returncode
+
+        pulled = []
+
+        def fake_run(cmd, **kwargs):
+            if cmd[:2] == ["adb", "devices"]:
+                return FakeCompleted(stdout=b"List of devices attached\nFAKEDEVICE\tdevice\n\n")
+            if cmd[3:6] == ["shell", "su", "-c"]:
+                return FakeCompleted(stdout="", returncode=1)
+            if cmd[3] == "shell" and cmd[4].startswith("test "):
+                return FakeCompleted(stdout=existing_dirs(cmd[4]))
+            if cmd[3] == "pull":
+                pulled.append(cmd[4])
+                dest = Path(cmd[-1])
+                dest.mkdir(parents=True, exist_ok=True)
+                name = "IMG-0001.jpg" if "Media" in cmd[4] else "msgstore.db.crypt14"
+                (dest / name).touch()
+                return FakeCompleted(stdout="", returncode=0)
+            return FakeCompleted(stdout="", returncode=0)
+
+        monkeypatch.setattr(acquirer_module.subprocess, "run", fake_run)
+        monkeypatch.setattr(acquirer_module.shutil, "which", lambda name: name)
+
+        acquirer = WhatsAppAcquirer(output_dir=str(tmp_path))
+        acquired = acquirer.acquire_from_android_adb(include_media=True)
+
+        assert "/sdcard/WhatsApp/Media" in acquired
+        assert Path(acquired["/sdcard/WhatsApp/Media"]).name == "media"
+        assert any(Path(p).name == "msgstore.db.crypt14" for p in acquired.values())
+        assert len([p for p in pulled if "Media" in p]) == 4
@@ -5,6 +5,7 @@
 Tests for end-to-end modular case workflow.
 """
 
+import hashlib
 import json
 import sqlite3
 import tempfile
@@ -66,19 +67,19 @@ def test_case_workflow_file_source_creates_manifest_and_reports():
         db_path = source_dir / "msgstore.db"
         _create_test_msgstore(db_path)
 
-        workflow = ForensicToolkitIntegration(
+        with ForensicToolkitIntegration(
             case_id="CASE_TEST_001",
             examiner="Unit Tester",
             output_dir=str(output_dir),
             enforce_write_blocker=False,
-        )
-        result = workflow.run_case_workflow(
-            source="file",
-            method="forensic_logical_copy",
-            input_path=str(source_dir),
-            report_format="json",
-            metadata={"company": "Test Co", "record": "CASE_TEST_001"},
-        )
+        ) as workflow:
+            result = workflow.run_case_workflow(
+                source="file",
+                method="forensic_logical_copy",
+                input_path=str(source_dir),
+                report_format="json",
+                metadata={"company": "Test Co", "record": "CASE_TEST_001"},
+            )
 
         assert result["success"] is True
         assert Path(result["case_directory"]).exists()
@@ -89,3 +90,31 @@ def test_case_workflow_file_source_creates_manifest_and_reports():
             manifest = json.load(fh)
         assert manifest["case_id"] == "CASE_TEST_001"
         assert len(manifest["artifacts"]) >= 1
+
+
+def test_acquire_with_compliance_logs_one_hash_verification_per_file():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        tmp = Path(tmpdir)
+        source_dir = tmp / "source_data"
+        source_dir.mkdir()
+        _create_test_msgstore(source_dir / "msgstore.db")
+        (source_dir / "key").write_bytes(b"k" * 158)
+
+        with ForensicToolkitIntegration(
+            case_id="CASE_TEST_002",
+            examiner="Unit Tester",
+            output_dir=str(tmp / "output"),
+            enforce_write_blocker=False,
+        ) as workflow:
+            result = workflow.acquire_with_compliance(
+                source="file", method="forensic_logical_copy", input_path=str(source_dir)
+            )
+            entries = [e for e in workflow.audit_logger.audit_entries if e["action"] == "verify_hash"]
+
+        assert result["success"] is True
+        assert result["integrity_verified"] is True
+        assert [e["resource"] for e in entries] == list(result["files"].values())
+        assert all(e["result"] == "verified" for e in entries)
+        for entry in entries:
+            digest = hashlib.sha256(Path(entry["resource"]).read_bytes()).hexdigest()
+            assert entry["details"]["hash_value"] == digest
@@ -5,11 +5,14 @@
 Tests for crypto module
 """
 
+import os
 import pytest
 import tempfile
+import zlib
 from pathlib import Path
 
 from src.crypto import WhatsAppDecryptor, EncryptionType
+from src.crypto.decryptor import AES
 
 
 class TestWhatsAppDecryptor:
@@ -26,6 +29,18 @@ class TestWhatsAppDecryptor:
             assert decryptor.key is not None
             assert len(decryptor.key) == 32
     
+    def test_key_reloaded_when_key_file_changes(self):
+        """Test the cached key follows changes to the key file"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            key_file = Path(tmpdir) / "key"
+            key_file.write_bytes(b'\x00' * 126 + b"a" * 32)
+            assert WhatsAppDecryptor(str(key_file)).key == b"a" * 32
+            assert WhatsAppDecryptor(str(key_file)).key == b"a" * 32
+            
+            key_file.write_bytes(b'\x00' * 126 + b"b" * 32)
+            os.utime(key_file, ns=(0, key_file.stat().st_mtime_ns + 1_000_000_000))
+            assert WhatsAppDecryptor(str(key_file)).key == b"b" * 32
+    
     def test_detect_encryption_type(self):
         """Test encryption type detection"""
         with tempfile.TemporaryDirectory() as tmpdir:
@@ -52,3 +67,77 @@ class TestWhatsAppDecryptor:
             db_file = Path(tmpdir) / "test.db"
             db_file.write_bytes(b"SQLite format 3\x00")
             assert decryptor.detect_encryption_type(str(db_file)) == EncryptionType.UNENCRYPTED
+    
+    def test_crypt14_streaming_round_trip(self):
+        """Test chunked decryption of a crypt14 backup larger than one chunk"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            key = bytes(range(32))
+            key_file = Path(tmpdir) / "key"
+            key_file.write_bytes(b'\x00' * 126 + key)
+            decryptor = WhatsAppDecryptor(str(key_file))
+            
+            plain = b"SQLite format 3\x00" + bytes(range(256)) * 20000
+            iv = b"\x01" * 16
+            encrypted = AES.new(key, mode=AES.MODE_GCM, nonce=iv).encrypt(zlib.compress(plain))
+            crypt14_file = Path(tmpdir) / "msgstore.db.crypt14"
+            crypt14_file.write_bytes(b"\x00" * 67 + iv + b"\x00" * 107 + encrypted + b"\x00" * 20)
+            
+            assert 190 in decryptor._crypt14_offset_candidates(str(crypt14_file), iv, range(185, 196))
+            
+            output_file = Path(tmpdir) / "msgstore.db"
+            assert decryptor.decrypt_crypt14(str(crypt14_file), str(output_file))
+            assert output_file.read_bytes() == plain
+            
+            # A wrong key must not leave a partial database behind
+            other_key_file = Path(tmpdir) / "other_key"
+            other_key_file.write_bytes(b'\x00' * 158)
+            output_file.unlink()
+            assert not WhatsAppDecryptor(str(other_key_file)).decrypt_crypt14(str(crypt14_file), str(output_file))
+            assert not output_file.exists()
+    
+    def test_crypt14_round_trip_through_openssl_backend(self):
+        """Test the cryptography (OpenSSL) AES-GCM backend decrypts like PyCryptodome"""
+        pytest.importorskip("cryptography")
+        from src.crypto import decryptor as decryptor_module
+        assert decryptor_module.Cipher is not None
+        
+        with tempfile.TemporaryDirectory() as tmpdir:
+            key = bytes(range(32))
+            key_file = Path(tmpdir) / "key"
+            key_file.write_bytes(b'\x00' * 126 + key)
+            
+            plain = b"SQLite format 3\x00" + bytes(range(256)) * 20000
+            iv = b"\x02" * 16
+            encrypted = AES.new(key, mode=AES.MODE_GCM, nonce=iv).encrypt(zlib.compress(plain))
+            
+            decrypt = decryptor_module._gcm_decryptor(key, iv)
+            assert decrypt(encrypted[:1000]) + decrypt(encrypted[1000:]) == zlib.compress(plain)
+            
+            crypt14_file = Path(tmpdir) / "msgstore.db.crypt14"
+            crypt14_file.write_bytes(b"\x00" * 67 + iv + b"\x00" * 107 + encrypted + b"\x00" * 20)
+            output_file = Path(tmpdir) / "msgstore.db"
+            assert WhatsAppDecryptor(str(key_file)).decrypt_crypt14(str(crypt14_file), str(output_file))
+            assert output_file.read_bytes() == plain
+    
+    def test_crypt12_encrypt_decrypt_round_trip(self):
+        """Test streamed crypt12 encryption decrypts back to the original database"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            key_file = Path(tmpdir) / "key"
+            key_file.write_bytes(b'\x00' * 126 + b"k" * 32)
+            decryptor = WhatsAppDecryptor(str(key_file))
+            
+            reference = Path(tmpdir) / "reference.crypt12"
+            reference.write_bytes(b"h" * 51 + b"i" * 16 + b"e" * 40 + b"f" * 20)
+            db_file = Path(tmpdir) / "msgstore.db"
+            db_file.write_bytes(b"SQLite format 3\x00" + b"row" * 500000)
+            
+            encrypted = Path(tmpdir) / "msgstore.db.crypt12"
+            decrypted = Path(tmpdir) / "decrypted.db"
+            assert decryptor.encrypt_crypt12(str(db_file), str(encrypted), str(reference))
+            assert decryptor.decrypt_crypt12(str(encrypted), str(decrypted))
+            assert decrypted.read_bytes() == db_file.read_bytes()
+            
+            fast = Path(tmpdir) / "fast.crypt12"
+            assert decryptor.encrypt_crypt12(str(db_file), str(fast), str(reference), compression_level=1)
+            assert decryptor.decrypt_crypt12(str(fast), str(decrypted))
+            assert decrypted.read_bytes() == db_file.read_bytes()
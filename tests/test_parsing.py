@@ -96,6 +96,83 @@ class TestWhatsAppParser:
             assert len(messages) > 0
             assert isinstance(messages[0], Message)
     
+    def test_iter_messages_matches_get_messages(self):
+        """Test streamed messages are the same as the extracted list"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            db_path = Path(tmpdir) / "msgstore.db"
+            self._create_test_db(db_path)
+            
+            parser = WhatsAppParser(str(db_path))
+            assert list(parser.iter_messages()) == parser.get_messages()
+            assert list(parser.iter_messages("1234567890@s.whatsapp.net", 1)) == parser.get_messages(
+                "1234567890@s.whatsapp.net", 1
+            )
+    
+    def test_count_messages_matches_get_messages(self):
+        """Test counting gives the number of messages get_messages returns"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            db_path = Path(tmpdir) / "msgstore.db"
+            self._create_test_db(db_path)
+            
+            conn = sqlite3.connect(db_path)
+            conn.execute(
+                "INSERT INTO message (_id, key_remote_jid, timestamp, key_from_me, data) "
+                "VALUES (2, '999@s.whatsapp.net', 1640995200001, 1, 'Reply')"
+            )
+            conn.commit()
+            conn.close()
+            
+            parser = WhatsAppParser(str(db_path))
+            assert parser.count_messages() == len(parser.get_messages()) == 2
+            assert parser.count_messages("999@s.whatsapp.net") == 1
+            assert parser.count_messages("missing@s.whatsapp.net") == 0
+    
+    def test_get_messages_batch_matches_per_chat(self):
+        """Test batched extraction returns the same messages as per-chat queries"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            db_path = Path(tmpdir) / "msgstore.db"
+            self._create_test_db(db_path)
+            
+            conn = sqlite3.connect(db_path)
+            for i in range(2, 6):
+                conn.execute(
+                    "INSERT INTO message (_id, key_remote_jid, timestamp, key_from_me, data) VALUES (?, ?, ?, 0, ?)",
+                    (i, "1234567890@s.whatsapp.net" if i % 2 else "999@s.whatsapp.net", 1640995200000 - i, f"m{i}")
+                )
+            conn.commit()
+            conn.close()
+            
+            parser = WhatsAppParser(str(db_path))
+            jids = ["1234567890@s.whatsapp.net", "999@s.whatsapp.net", "missing@s.whatsapp.net"]
+            batch = parser.get_messages_batch(jids, limit_per_chat=2)
+            
+            for jid in jids:
+                expected = parser.get_messages(jid, 2)
+                assert [m.message_id for m in batch[jid]] == [m.message_id for m in expected]
+            assert batch["missing@s.whatsapp.net"] == []
+    
+    def test_rows_to_messages_any_column_order(self):
+        """Test messages are built the same whatever order the columns come in"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            db_path = Path(tmpdir) / "msgstore.db"
+            self._create_test_db(db_path)
+            
+            parser = WhatsAppParser(str(db_path))
+            conn = sqlite3.connect(db_path)
+            cursor = conn.execute("""
+                SELECT data as message_text, timestamp, key_remote_jid as chat_jid,
+                       key_from_me as from_me, _id as message_id
+                FROM message
+            """)
+            messages = list(WhatsAppParser._rows_to_messages(cursor))
+            conn.close()
+            
+            expected = parser.get_messages()[0]
+            assert messages[0].message_id == expected.message_id
+            assert messages[0].message_text == expected.message_text == "Test message"
+            assert messages[0].from_me is False
+            assert messages[0].timestamp == expected.timestamp
+    
     def test_get_contacts(self):
         """Test contact extraction"""
         with tempfile.TemporaryDirectory() as tmpdir:
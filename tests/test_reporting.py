@@ -123,3 +123,41 @@ class TestWhatsAppReporter:
             
             # PDF content verification is complex, checking file existence and size is usually enough for unit tests
             assert Path(report_file).stat().st_size > 0
+
+    def test_reports_render_from_shared_view_model(self):
+        """Test every format renders from one prepared view model"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            reporter = WhatsAppReporter(output_dir=tmpdir)
+            
+            chats = [Chat(jid="1234567890@s.whatsapp.net", display_name="Test Chat")]
+            chats[0].messages.append(Message(
+                message_id=1,
+                chat_jid="1234567890@s.whatsapp.net",
+                timestamp=1620000000000,
+                from_me=False,
+                message_text="Hello World"
+            ))
+            contacts = [Contact(jid="1234567890@s.whatsapp.net", display_name="Test")]
+            call_logs = [CallLog(call_id=1, jid="1234567890@s.whatsapp.net", timestamp=1620000000000,
+                                 from_me=True, duration=30, video_call=False)]
+            
+            view_model = reporter.prepare_view_model(chats, contacts, call_logs, {'company': 'Test Company'})
+            assert view_model['summary']['total_messages'] == 1
+            
+            html_file = reporter.generate_html_report([], [], [], view_model=view_model)
+            json_file = reporter.generate_json_report([], [], [], view_model=view_model)
+            csv_files = reporter.generate_csv_report([], [], [], view_model=view_model)
+            
+            with open(html_file, 'r') as f:
+                content = f.read()
+                assert 'Test Company' in content
+                assert 'Test Chat' in content
+            
+            import json
+            with open(json_file, 'r') as f:
+                data = json.load(f)
+                assert data['chats'][0]['messages'][0]['message_text'] == "Hello World"
+                assert 'message_senders' not in data['chats'][0]
+                assert 'remote_resource' not in data['chats'][0]['messages'][0]
+            
+            assert len(csv_files) == 3